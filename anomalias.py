@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+from esbocos import mesclar_esbocos, quantis_do_esboco, valor_balde
+
+# Um protocolo é ponto de atenção quando o tempo passa de mediana + LIMITE_Z * 1.4826 * MAD da sua fila
+# (z-score robusto; 1.4826 torna o MAD comparável ao desvio padrão de uma distribuição normal)
+LIMITE_Z = 3.5
+FATOR_MAD = 1.4826
+
+# MAD mínimo (em segundos) para filas em que quase todos os protocolos têm o mesmo tempo
+MAD_MINIMO = 1.0
+
+# Função para calcular a mediana ponderada de valores com contagens
+def mediana_ponderada(valores, contagens):
+    ordem = np.argsort(valores)
+    valores, contagens = valores[ordem], contagens[ordem]
+    acumulado = np.cumsum(contagens)
+    return float(valores[np.searchsorted(acumulado, acumulado[-1] / 2)])
+
+# Função para calcular a mediana e o MAD do tempo operacional de cada fila a partir dos esboços de quantis
+# Roda uma vez por versão dos dados e o resultado fica guardado junto com os agregados
+def calcular_baselines(quantis):
+    linhas = []
+    for fila, esbocos_fila in quantis.groupby('FILA'):
+        contagens = mesclar_esbocos(esbocos_fila)
+        mediana = quantis_do_esboco(contagens, (0.5,))[0.5]
+        valores = valor_balde(contagens.index.to_numpy())
+        mad = mediana_ponderada(np.abs(valores - mediana), contagens.to_numpy())
+        linhas.append({'FILA': fila, 'Mediana': mediana, 'MAD': mad})
+    baselines = pd.DataFrame(linhas, columns=['FILA', 'Mediana', 'MAD'])
+    baselines['Limite'] = baselines['Mediana'] + LIMITE_Z * FATOR_MAD * baselines['MAD'].clip(lower=MAD_MINIMO)
+    return baselines.set_index('FILA')
+
+# Função para identificar os protocolos do analista com tempo de análise muito acima do padrão da fila
+# Custa uma busca do limite de cada fila e uma comparação sobre as linhas do analista
+def get_points_of_attention(df_analista, baselines):
+    colunas = ['Protocolo', 'Fila', 'Tempo de Análise', 'Limite da Fila', 'Data de Conclusão']
+    if df_analista.empty or 'FILA' not in df_analista.columns or baselines.empty:
+        return pd.DataFrame(columns=colunas)
+
+    df = df_analista[df_analista['SITUAÇÃO DA TAREFA'].isin(['Finalizada', 'Cancelada'])]
+    segundos = df['TEMPO MÉDIO OPERACIONAL'].dt.total_seconds()
+    limites = df['FILA'].fillna('').map(baselines['Limite'])
+    pontos = df[segundos > limites]
+
+    return pd.DataFrame({
+        'Protocolo': pontos['NÚMERO DO PROTOCOLO'],
+        'Fila': pontos['FILA'],
+        'Tempo de Análise': pontos['TEMPO MÉDIO OPERACIONAL'],
+        'Limite da Fila': pd.to_timedelta(limites[pontos.index], unit='s'),
+        'Data de Conclusão': pontos['DATA DE CONCLUSÃO DA TAREFA']
+    }, columns=colunas).sort_values('Tempo de Análise', ascending=False)
@@ -1,6 +1,5 @@
 import streamlit as st
-from login import login
-from dashboard import dashboard
+from login import login, iniciar_vigia_pastas
 
 st.set_page_config(
     page_title="Dashboard",  # Título da aba do navegador
@@ -9,6 +8,9 @@ st.set_page_config(
     initial_sidebar_state="expanded"  # Barra lateral sempre expandida# Layout da página, pode ser "wide" ou "centered"]bac
 )
 
+# A ingestão das pastas de entrada começa com o processo, não depende de alguém fazer login
+iniciar_vigia_pastas()
+
 if "theme" not in st.session_state:
     st.session_state.theme = "dark"  # Tema padrão
 
@@ -22,4 +24,6 @@ if not st.session_state.logado:
         st.rerun()  # Reinicia a aplicação para carregar a dashboard
 else:
     # Se estiver logado, mostra a dashboard
+    # A dashboard (pandas, plotly etc.) só é importada depois do login, a tela de login precisa apenas do streamlit
+    from dashboard import dashboard
     dashboard()
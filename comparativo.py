@@ -0,0 +1,86 @@
+import os
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import pandas as pd
+
+from rollups import rollups_atualizados
+from particoes import obter_particoes, ler_indice, indice_atual
+
+FINALIZACOES = ['Subsídio Completo', 'Subsídio Parcial', 'Fora do Escopo']
+
+# Função executada em um processo separado: importa a planilha da equipe se preciso e grava os agregados da versão atual
+def recalcular_rollups(usuario):
+    obter_particoes(usuario)
+    return usuario
+
+# Função para obter a versão dos dados da equipe pelo índice das partições (None se ainda não foi importada)
+def versao_equipe(usuario):
+    indice = ler_indice(usuario)
+    return indice['versao'] if indice_atual(indice) else None
+
+# Função para obter os agregados de todas as equipes
+# As equipes com agregados da versão atual são lidas direto; as demais são recalculadas em paralelo em processos separados.
+# Os processos são iniciados com spawn: um fork do servidor do Streamlit (com várias threads) pode copiar travas já
+# ocupadas e deixar o processo filho travado
+# Os erros são tratados equipe a equipe (ex.: planilha ilegível): a equipe fica de fora e volta com a mensagem do erro
+def rollups_das_equipes(usuarios, processos=None):
+    rollups = {usuario: rollups_atualizados(usuario, versao_equipe(usuario)) for usuario in usuarios}
+    desatualizados = [usuario for usuario, agregados in rollups.items() if agregados is None]
+    falhas = {}
+    if desatualizados:
+        contexto = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=processos or min(len(desatualizados), os.cpu_count() or 1), mp_context=contexto) as executor:
+            tarefas = {executor.submit(recalcular_rollups, usuario): usuario for usuario in desatualizados}
+            for tarefa in as_completed(tarefas):
+                usuario = tarefas[tarefa]
+                try:
+                    tarefa.result()
+                except Exception as erro:
+                    falhas[usuario] = f"{type(erro).__name__}: {erro}"
+                    continue
+                rollups[usuario] = rollups_atualizados(usuario, versao_equipe(usuario))
+    return {usuario: agregados for usuario, agregados in rollups.items() if agregados is not None}, falhas
+
+# Função para calcular o período coberto pelos dados de todas as equipes
+def periodo_equipes(rollups):
+    dias = [agregados['diario']['Dia'] for agregados in rollups.values() if not agregados['diario'].empty]
+    if not dias:
+        return None
+    dias = pd.concat(dias)
+    return dias.min().date(), dias.max().date()
+
+# Função para calcular o agregado parcial de uma equipe no período a partir dos totais diários
+# (os analistas vão como conjunto para que o total geral conte cada pessoa uma vez só)
+def agregar_equipe(usuario, rollups, data_inicial, data_final):
+    diario = rollups['diario']
+    diario = diario[(diario['Dia'] >= pd.Timestamp(data_inicial)) & (diario['Dia'] <= pd.Timestamp(data_final))]
+    concluidas = diario[diario['SITUAÇÃO DA TAREFA'].isin(['Finalizada', 'Cancelada'])]
+    finalizacoes = diario.groupby('FINALIZAÇÃO')['Contagem'].sum()
+    return {
+        'Equipe': usuario,
+        'Finalizadas': int(concluidas.loc[concluidas['SITUAÇÃO DA TAREFA'] == 'Finalizada', 'Contagem'].sum()),
+        'Canceladas': int(concluidas.loc[concluidas['SITUAÇÃO DA TAREFA'] == 'Cancelada', 'Contagem'].sum()),
+        'Tempo_Total': float(concluidas['Tempo_Total'].sum()),
+        'Analistas': set(concluidas['USUÁRIO QUE CONCLUIU A TAREFA']),
+        **{finalizacao: int(finalizacoes.get(finalizacao, 0)) for finalizacao in FINALIZACOES}
+    }
+
+# Função para juntar os agregados parciais das equipes em uma tabela, com uma linha de total geral
+def comparar_equipes(rollups, data_inicial, data_final):
+    parciais = pd.DataFrame([agregar_equipe(usuario, agregados, data_inicial, data_final) for usuario, agregados in rollups.items()])
+    if parciais.empty:
+        return parciais
+    total = parciais.drop(columns=['Equipe', 'Analistas']).sum()
+    total['Equipe'] = 'Todas as Equipes'
+    # Um analista que atende mais de uma equipe conta uma vez no total
+    total['Analistas'] = len(set().union(*parciais['Analistas']))
+    parciais['Analistas'] = parciais['Analistas'].map(len)
+    comparativo = pd.concat([parciais, total.to_frame().T], ignore_index=True)
+    colunas_inteiras = ['Analistas', 'Finalizadas', 'Canceladas'] + FINALIZACOES
+    comparativo[colunas_inteiras] = comparativo[colunas_inteiras].astype(int)
+    comparativo['Tempo_Total'] = comparativo['Tempo_Total'].astype(float)
+
+    comparativo['Produtividade'] = comparativo['Finalizadas'] + comparativo['Canceladas']
+    tmo_segundos = (comparativo['Tempo_Total'] / comparativo['Produtividade'].where(comparativo['Produtividade'] > 0)).fillna(0)
+    comparativo['TMO'] = pd.to_timedelta(tmo_segundos.astype(float), unit='s')
+    return comparativo[['Equipe', 'Analistas', 'Produtividade', 'Finalizadas', 'Canceladas', 'TMO'] + FINALIZACOES]
@@ -0,0 +1,164 @@
+import pandas as pd
+import os
+import glob
+import json
+import threading
+import time
+from collections import Counter, OrderedDict
+
+# Quantidade de usuários com a janela quente mantida no cache do processo e de agregados por combinação de filtros
+MAX_USUARIOS_EM_CACHE = 8
+MAX_AGREGADOS_EM_CACHE = 64
+
+# Tempo sem acessos (em segundos) para considerar o servidor ocioso e quantas equipes pré-aquecer
+SEGUNDOS_OCIOSO = 300
+EQUIPES_PRE_AQUECIDAS = 3
+ARQUIVO_ACESSOS = 'acessos_login.json'
+
+# Travas por usuário compartilhadas por todos os módulos que leem ou gravam os arquivos do usuário
+# (planilha, partições e agregados); reentrante para que uma gravação possa chamar as leituras
+_trava_travas = threading.Lock()
+_travas_usuario = {}
+
+# Função para obter a trava de um usuário
+def trava_usuario(usuario):
+    with _trava_travas:
+        return _travas_usuario.setdefault(usuario, threading.RLock())
+
+# Função para carregar os dados do Excel do usuário logado (importados uma vez para as partições mensais)
+# Se a planilha existe mas não pode ser lida o erro é repassado, sem substituir o histórico por uma planilha vazia
+def load_data(usuario):
+    excel_file = f'dados_acumulados_{usuario}.xlsx'
+
+    with trava_usuario(usuario):
+        if os.path.exists(excel_file):
+            return pd.read_excel(excel_file, engine='openpyxl')
+
+        # Cria um DataFrame vazio e salva um novo arquivo se não existir
+        df_total = pd.DataFrame(columns=[
+            'NÚMERO DO PROTOCOLO', 
+            'USUÁRIO QUE CONCLUIU A TAREFA', 
+            'SITUAÇÃO DA TAREFA', 
+            'TEMPO MÉDIO OPERACIONAL', 
+            'DATA DE CONCLUSÃO DA TAREFA', 
+            'FINALIZAÇÃO'
+        ])
+        save_data(df_total, usuario)
+    return df_total
+
+# Função para listar os usuários que têm dados acumulados na pasta atual (planilha ou partições mensais)
+def listar_usuarios():
+    prefixo = 'dados_acumulados_'
+    usuarios = {os.path.basename(arquivo)[len(prefixo):-len('.xlsx')] for arquivo in glob.glob(f'{prefixo}*.xlsx')}
+    usuarios |= {os.path.dirname(arquivo)[len('particoes_'):] for arquivo in glob.glob(os.path.join('particoes_*', 'indice.json'))}
+    return sorted(usuarios)
+
+# Função para salvar os dados no Excel do usuário logado
+# A planilha é escrita num arquivo temporário e só então substitui a anterior, então uma leitura nunca encontra o arquivo pela metade
+def save_data(df, usuario):
+    excel_file = f'dados_acumulados_{usuario}.xlsx'  # Nome do arquivo específico do usuário
+    arquivo_temporario = f'~{excel_file}'
+    df['TEMPO MÉDIO OPERACIONAL'] = df['TEMPO MÉDIO OPERACIONAL'].astype(str)
+    with trava_usuario(usuario):
+        with pd.ExcelWriter(arquivo_temporario, engine='openpyxl', mode='w') as writer:
+            df.to_excel(writer, index=False)
+        os.replace(arquivo_temporario, excel_file)
+
+# Função para garantir que a coluna 'TEMPO MÉDIO OPERACIONAL' esteja no formato timedelta para cálculos
+def convert_to_timedelta_for_calculations(df):
+    df['TEMPO MÉDIO OPERACIONAL'] = converter_duracoes(df['TEMPO MÉDIO OPERACIONAL'])
+    return df
+
+# Função para converter uma coluna de durações em timedelta (valores inválidos viram NaT)
+# Colunas com tipos misturados, como as células hh:mm:ss do Excel lidas como datetime.time, são convertidas
+# pelo texto, como acontecia quando a planilha acumulada gravava a coluna com astype(str)
+def converter_duracoes(serie):
+    if serie.dtype == object:
+        serie = serie.astype(str)
+    return pd.to_timedelta(serie, errors='coerce')
+
+# Função para garantir que a coluna 'DATA CRIAÇÃO DA TAREFA' esteja no formato de datetime
+def convert_to_datetime_for_calculations(df):
+    df['DATA DE CONCLUSÃO DA TAREFA'] = pd.to_datetime(df['DATA DE CONCLUSÃO DA TAREFA'], format='%d/%m/%Y %H:%M:%S', errors='coerce')
+    return df
+
+# Cache do processo compartilhado entre sessões e threads: agregados por combinação de filtros
+_agregados_em_cache = OrderedDict()
+_trava_cache = threading.Lock()
+_trava_acessos = threading.Lock()
+_ultima_atividade = time.monotonic()
+
+# Função para registrar que a dashboard está em uso (o pré-aquecimento só roda com o servidor ocioso)
+def registrar_atividade():
+    global _ultima_atividade
+    _ultima_atividade = time.monotonic()
+
+# Função para copiar os agregados (dicionário com totais e DataFrames), para que uma sessão não altere o cache das outras
+# Com copy-on-write do pandas a cópia dos DataFrames só duplica os dados se forem modificados
+def copiar_agregados(agregados):
+    return {chave: valor.copy() if isinstance(valor, (pd.DataFrame, pd.Series)) else valor for chave, valor in agregados.items()}
+
+# Função para obter agregados do cache do processo ou calculá-los e guardá-los pela chave (versão + filtros)
+# Cada chamada recebe a sua própria cópia
+def agregados_em_cache(chave, calcular):
+    with _trava_cache:
+        if chave in _agregados_em_cache:
+            _agregados_em_cache.move_to_end(chave)
+            return copiar_agregados(_agregados_em_cache[chave])
+    agregados = calcular()
+    with _trava_cache:
+        _agregados_em_cache[chave] = agregados
+        while len(_agregados_em_cache) > MAX_AGREGADOS_EM_CACHE:
+            _agregados_em_cache.popitem(last=False)
+    return copiar_agregados(agregados)
+
+# Função para carregar os meses da janela quente e calcular os agregados da visão padrão, deixando o primeiro acesso à dashboard no cache
+def aquecer_cache(usuario, registrar=True):
+    from metricas import calcular_visao_geral
+    from particoes import obter_particoes, periodo_padrao, carregar_periodo
+
+    if registrar:
+        registrar_atividade()
+    indice = obter_particoes(usuario)
+    if indice['data_maxima'] is None:
+        return
+    data_inicial, data_final = periodo_padrao(indice)
+    df_total = carregar_periodo(usuario, indice, data_inicial, data_final)
+    df_periodo = df_total[(df_total['DATA DE CONCLUSÃO DA TAREFA'].dt.date >= data_inicial) & (df_total['DATA DE CONCLUSÃO DA TAREFA'].dt.date <= data_final)]
+    agregados_em_cache(('visao_geral', indice['versao'], data_inicial, data_final), lambda: calcular_visao_geral(df_periodo))
+
+# Função para registrar o login do usuário, usada para saber quais equipes pré-aquecer quando o servidor estiver ocioso
+# A contagem tem a sua própria trava, assim a gravação do arquivo não bloqueia as sessões que consultam o cache
+def registrar_acesso(usuario):
+    with _trava_acessos:
+        acessos = Counter(ler_acessos())
+        acessos[usuario] += 1
+        arquivo_temporario = ARQUIVO_ACESSOS + '.tmp'
+        with open(arquivo_temporario, 'w', encoding='utf-8') as file:
+            json.dump(acessos, file)
+        os.replace(arquivo_temporario, ARQUIVO_ACESSOS)
+
+# Função para ler a contagem de logins por usuário
+def ler_acessos():
+    try:
+        with open(ARQUIVO_ACESSOS, 'r', encoding='utf-8') as file:
+            return json.load(file)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+# Laço executado em segundo plano: quando não há acessos por SEGUNDOS_OCIOSO, pré-aquece as equipes mais usadas
+# A primeira verificação é imediata; quem inicia a thread espera SEGUNDOS_OCIOSO antes de importar este módulo
+def pre_aquecer_quando_ocioso():
+    while True:
+        if time.monotonic() - _ultima_atividade >= SEGUNDOS_OCIOSO:
+            mais_usados = Counter(ler_acessos()).most_common(EQUIPES_PRE_AQUECIDAS)
+            com_dados = listar_usuarios()
+            for usuario, _ in mais_usados:
+                if usuario not in com_dados:
+                    continue
+                try:
+                    aquecer_cache(usuario, registrar=False)
+                except Exception:
+                    # O pré-aquecimento é só uma otimização, uma falha aqui não pode derrubar a thread
+                    pass
+        time.sleep(SEGUNDOS_OCIOSO)
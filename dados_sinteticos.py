@@ -0,0 +1,29 @@
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+# Dados sintéticos no formato da planilha exportada pelo sistema, usados pelo teste de carga (teste_carga.py)
+# e pelo teste de equivalência das métricas (equivalencia.py)
+
+ANALISTAS = ['Ana', 'Bruno', 'Carla', 'Diego', 'Elisa', 'Fábio', 'Gabriela', 'Hugo']
+FILAS = ['Cível', 'Trabalhista', 'Tributário', 'Consumidor']
+FINALIZACOES = ['Subsídio Completo', 'Subsídio Parcial', 'Fora do Escopo']
+
+# Função para gerar uma planilha sintética no formato exportado pelo sistema, com datas dos últimos `dias`
+def gerar_planilha(linhas, dias, semente):
+    rng = np.random.default_rng(semente)
+    fim = pd.Timestamp(datetime.today().replace(hour=0, minute=0, second=0, microsecond=0))
+    datas = fim - pd.to_timedelta(rng.integers(0, dias * 86400, linhas), unit='s')
+    tempos = pd.to_timedelta(rng.lognormal(6, 0.8, linhas).astype(np.int64), unit='s')
+    return pd.DataFrame({
+        'NÚMERO DO PROTOCOLO': rng.integers(10 ** 6, 10 ** 7, linhas),
+        'USUÁRIO QUE CONCLUIU A TAREFA': rng.choice(ANALISTAS, linhas),
+        'SITUAÇÃO DA TAREFA': rng.choice(['Finalizada', 'Cancelada'], linhas, p=[0.85, 0.15]),
+        'TEMPO MÉDIO OPERACIONAL': [str(tempo) for tempo in tempos.to_pytimedelta()],
+        'DATA DE CONCLUSÃO DA TAREFA': datas.strftime('%d/%m/%Y %H:%M:%S'),
+        'FINALIZAÇÃO': rng.choice(FINALIZACOES, linhas),
+        'FILA': rng.choice(FILAS, linhas),
+        'NÚMERO REQUISIÇÃO': np.where(rng.random(linhas) < 0.3, rng.integers(1, 10 ** 5, linhas), None),
+        'ID PROJURIS': np.where(rng.random(linhas) < 0.5, rng.integers(1, 10 ** 5, linhas), None)
+    })
@@ -1,114 +1,53 @@
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import os
-from streamlit_extras.customize_running import center_running 
+import plotly.io as pio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+from streamlit.runtime.scriptrunner_utils.script_run_context import SCRIPT_RUN_CONTEXT_ATTR_NAME
 from datetime import datetime
-from diario import diario  # Importa o diário de bordo
-    
-# Função para carregar os dados do Excel do usuário logado
-def load_data(usuario):
-    excel_file = f'dados_acumulados_{usuario}.xlsx'
-    
-    # Verifica se o arquivo existe e se está intacto
+from tabelas import exibir_tabela, exibir_exportacao  # Tabelas paginadas sem pandas Styler
+from metricas import format_timedelta, calcular_tmo_por_dia_geral, calcular_visao_geral, calcular_totais_analista, calcular_tmo_equipe, calcular_filas_analista, calcular_protocolos_analista
+from graficos import grafico_produtividade, grafico_tmo_equipe, grafico_tmo_analista_por_dia, grafico_mapa_calor, grafico_produtividade_equipes, grafico_tmo_equipes, grafico_finalizacoes_equipes, grafico_produtividade_movel, grafico_tmo_movel, grafico_pizza, grafico_tmo_por_analista
+from dados import registrar_atividade, agregados_em_cache, listar_usuarios
+from ingestao import ingerir_planilha
+from rollups import percentis_tmo, percentis_por_fila, mapa_calor_semana
+from particoes import obter_particoes_e_rollups, carregar_periodo, limites_datas, periodo_padrao, analistas_do_periodo
+from janelas import series_moveis
+from anomalias import get_points_of_attention
+from comparativo import rollups_das_equipes, periodo_equipes, comparar_equipes, FINALIZACOES
+from login import gestores
+
+# Serializa a figura uma única vez por chave (versão dos dados + filtros)
+@st.cache_data(max_entries=256, show_spinner=False)
+def _figura_serializada(chave, _construir):
+    return _construir().to_json()
+
+# Função para obter a figura do cache; o construtor só roda quando a chave ainda não foi vista
+def figura_em_cache(chave, construir):
+    return pio.from_json(_figura_serializada(chave, construir), skip_invalid=True)
+
+# Threads por execução da visão para montar as figuras e tabelas ao mesmo tempo
+MAX_CONSTRUTORES = 4
+
+# Função para montar figuras e tabelas em paralelo: recebe nome -> construtor e devolve nome -> futuro,
+# que a visão consulta (.result()) na ordem do layout. Cada chamada tem o seu pool, para uma sessão não esperar
+# na fila de outra; o contexto da sessão vai junto para os caches do Streamlit e é retirado da thread ao fim da tarefa
+def construir_em_paralelo(construtores):
+    contexto = get_script_run_ctx()
+    def executar(construir):
+        thread = threading.current_thread()
+        add_script_run_ctx(thread, contexto)
+        try:
+            return construir()
+        finally:
+            setattr(thread, SCRIPT_RUN_CONTEXT_ATTR_NAME, None)
+    pool = ThreadPoolExecutor(max_workers=MAX_CONSTRUTORES, thread_name_prefix='construtor')
     try:
-        if os.path.exists(excel_file):
-            df_total = pd.read_excel(excel_file, engine='openpyxl')
-        else:
-            raise FileNotFoundError
-        
-    except (FileNotFoundError, ValueError, OSError):
-        # Cria um DataFrame vazio e salva um novo arquivo se não existir ou se estiver corrompido
-        df_total = pd.DataFrame(columns=[
-            'NÚMERO DO PROTOCOLO', 
-            'USUÁRIO QUE CONCLUIU A TAREFA', 
-            'SITUAÇÃO DA TAREFA', 
-            'TEMPO MÉDIO OPERACIONAL', 
-            'DATA DE CONCLUSÃO DA TAREFA', 
-            'FINALIZAÇÃO'
-        ])
-        df_total.to_excel(excel_file, index=False, engine='openpyxl')
-    
-    return df_total
-
-# Função para salvar os dados no Excel do usuário logado
-def save_data(df, usuario):
-    excel_file = f'dados_acumulados_{usuario}.xlsx'  # Nome do arquivo específico do usuário
-    df['TEMPO MÉDIO OPERACIONAL'] = df['TEMPO MÉDIO OPERACIONAL'].astype(str)
-    with pd.ExcelWriter(excel_file, engine='openpyxl', mode='w') as writer:
-        df.to_excel(writer, index=False)
-
-# Função para garantir que a coluna 'TEMPO MÉDIO OPERACIONAL' esteja no formato timedelta para cálculos
-def convert_to_timedelta_for_calculations(df):
-    df['TEMPO MÉDIO OPERACIONAL'] = pd.to_timedelta(df['TEMPO MÉDIO OPERACIONAL'], errors='coerce')
-    return df
-
-# Função para garantir que a coluna 'DATA CRIAÇÃO DA TAREFA' esteja no formato de datetime
-def convert_to_datetime_for_calculations(df):
-    df['DATA DE CONCLUSÃO DA TAREFA'] = pd.to_datetime(df['DATA DE CONCLUSÃO DA TAREFA'], format='%d/%m/%Y %H:%M:%S', errors='coerce')
-    return df
-
-# Função para formatar timedelta no formato HH:MM:SS
-def format_timedelta(td):
-    if pd.isnull(td):
-        return "0 min"
-    total_seconds = int(td.total_seconds())
-    minutes, seconds = divmod(total_seconds, 60)
-    return f"{minutes} min {seconds}s"
-
-# Função para calcular o TMO por dia
-def calcular_tmo_por_dia(df):
-    df['Dia'] = pd.to_datetime(df['DATA DE CONCLUSÃO DA TAREFA']).dt.date
-    df_finalizados = df[df['SITUAÇÃO DA TAREFA'].isin(['Finalizada', 'Cancelada'])].copy()
-    
-    # Agrupando por dia
-    df_tmo = df_finalizados.groupby('Dia').agg(
-        Tempo_Total=('TEMPO MÉDIO OPERACIONAL', 'sum'),  # Soma total do tempo
-        Total_Finalizados_Cancelados=('SITUAÇÃO DA TAREFA', 'count')  # Total de tarefas finalizadas ou canceladas
-    ).reset_index()
-
-    # Calcula o TMO (Tempo Médio Operacional)
-    df_tmo['TMO'] = df_tmo['Tempo_Total'] / df_tmo['Total_Finalizados_Cancelados']
-    
-    # Formata o tempo médio no formato HH:MM:SS
-    df_tmo['TMO'] = df_tmo['TMO'].apply(format_timedelta)
-    return df_tmo[['Dia', 'TMO']]
-
-def calcular_tmo_por_dia_geral(df):
-    # Certifica-se de que a coluna de data está no formato correto
-    df['Dia'] = pd.to_datetime(df['DATA DE CONCLUSÃO DA TAREFA']).dt.date
-
-    # Filtra tarefas finalizadas ou canceladas, pois estas são relevantes para o cálculo do TMO
-    df_finalizados = df[df['SITUAÇÃO DA TAREFA'].isin(['Finalizada', 'Cancelada'])].copy()
-    
-    # Agrupamento por dia para calcular o tempo médio diário
-    df_tmo = df_finalizados.groupby('Dia').agg(
-        Tempo_Total=('TEMPO MÉDIO OPERACIONAL', 'sum'),  # Soma total do tempo por dia
-        Total_Finalizados_Cancelados=('SITUAÇÃO DA TAREFA', 'count')  # Total de tarefas finalizadas/canceladas por dia
-    ).reset_index()
-
-    # Calcula o TMO (Tempo Médio Operacional) diário
-    df_tmo['TMO'] = df_tmo['Tempo_Total'] / df_tmo['Total_Finalizados_Cancelados']
-    
-    # Remove valores nulos e formata o tempo médio para o gráfico
-    df_tmo['TMO'] = df_tmo['TMO'].fillna(pd.Timedelta(seconds=0))  # Preenche com zero se houver NaN
-    df_tmo['TMO_Formatado'] = df_tmo['TMO'].apply(format_timedelta)  # Formata para exibição
-    
-    return df_tmo[['Dia', 'TMO', 'TMO_Formatado']]
-
-def calcular_produtividade_diaria(df):
-    # Garante que a coluna 'Próximo' esteja em formato de data
-    df['Dia'] = df['DATA DE CONCLUSÃO DA TAREFA'].dt.date
-
-    # Agrupa e soma os status para calcular a produtividade
-    df_produtividade = df.groupby('Dia').agg(
-        Finalizado=('SITUAÇÃO DA TAREFA', lambda x: x[x == 'Finalizada'].count()),
-        Cancelada=('SITUAÇÃO DA TAREFA', lambda x: x[x == 'Cancelada'].count())
-    ).reset_index()
-
-    # Calcula a produtividade total
-    df_produtividade['Produtividade'] = + df_produtividade['Finalizado'] + df_produtividade['Cancelada']
-    return df_produtividade
+        return {nome: pool.submit(executar, construir) for nome, construir in construtores.items()}
+    finally:
+        # As tarefas já enviadas continuam; as threads terminam quando a fila esvazia
+        pool.shutdown(wait=False)
 
 # def editar_planilha(usuario):
 #     # Lê a planilha do usuário
@@ -143,9 +82,7 @@ def calcular_produtividade_diaria(df):
 def dashboard():
     st.title("Dashboard de Produtividade")
     
-    # Carregar dados acumulados do arquivo Excel do usuário logado
     usuario_logado = st.session_state.usuario_logado  # Obtém o usuário logado
-    df_total = load_data(usuario_logado)  # Carrega dados específicos do usuário
     # if usuario_logado == "usuario1":
     #     usuario = "Viviane"
     # else:
@@ -166,70 +103,84 @@ def dashboard():
 
     # Sidebar para navegação
     st.sidebar.header("Navegação")
-    opcao_selecionada = st.sidebar.selectbox("Escolha uma visão", ["Visão Geral", "Métricas Individuais", "Diário de Bordo"])
+    visoes = ["Visão Geral", "Métricas Individuais", "Diário de Bordo"]
+    if usuario_logado in gestores:
+        visoes.append("Comparativo entre Equipes")
+    opcao_selecionada = st.sidebar.selectbox("Escolha uma visão", visoes)
 
     # Upload de planilha na sidebar
     uploaded_file = st.sidebar.file_uploader("Carregar nova planilha", type=["xlsx"])
     
-    if uploaded_file is not None:
-        df_new = pd.read_excel(uploaded_file)
-        df_total = pd.concat([df_total, df_new], ignore_index=True)
-        save_data(df_total, usuario_logado)  # Atualiza a planilha específica do usuário
-        st.sidebar.success(f'Arquivo "{uploaded_file.name}" carregado e processado com sucesso!')
+    # O arquivo continua no uploader entre as reexecuções, então cada upload é validado e gravado uma única vez
+    # e as mensagens do resultado ficam guardadas para continuar aparecendo
+    if "arquivos_processados" not in st.session_state:
+        st.session_state.arquivos_processados = {}
+
+    if uploaded_file is not None and uploaded_file.file_id not in st.session_state.arquivos_processados:
+        # Mesmas regras de validação e de arquivos repetidos das pastas de entrada monitoradas
+        # Uma falha inesperada também fica registrada, para o arquivo não ser processado de novo a cada reexecução
+        try:
+            mensagens = ingerir_planilha(usuario_logado, uploaded_file, uploaded_file.name)
+        except Exception as erro:
+            mensagens = [('error', f'Erro ao processar o arquivo "{uploaded_file.name}": {type(erro).__name__}: {erro}')]
+        st.session_state.arquivos_processados[uploaded_file.file_id] = mensagens
 
-    # Converte para timedelta e datetime apenas para operações temporárias
-    df_total = convert_to_timedelta_for_calculations(df_total)
-    df_total = convert_to_datetime_for_calculations(df_total)
+    if uploaded_file is not None:
+        for tipo, mensagem in st.session_state.arquivos_processados[uploaded_file.file_id]:
+            getattr(st.sidebar, tipo)(mensagem)
+
+    # Índice das partições mensais (manifesto do conjunto de dados) e agregados do usuário logado; a planilha acumulada só é lida na primeira importação
+    # Datas dos filtros vêm do manifesto, sem percorrer as linhas; os seletores de analista mostram só quem tem tarefas no período
+    # As linhas são carregadas por período em cada visão: a janela recente fica na memória e os meses antigos só são lidos sob demanda
+    registrar_atividade()
+    # Índice e agregados vêm juntos, da mesma versão, mesmo que uma carga troque a versão logo em seguida
+    indice, rollups = obter_particoes_e_rollups(usuario_logado)
+    versao = indice['versao']
+    min_date, max_date = limites_datas(indice)
+    inicio_padrao = periodo_padrao(indice)[0]
 
     custom_colors = ['#ff571c', '#7f2b0e', '#4c1908', '#ff884d', '#a34b28', '#331309']
 
-    # Função para calcular TMO por dia
-    df_tmo = calcular_tmo_por_dia(df_total)
-
-    def calcular_tmo_por_analista(df):
-        df_finalizados = df[df['SITUAÇÃO DA TAREFA'].isin(['Finalizada', 'Cancelada'])].copy()
-
-        # Agrupando por analista
-        df_tmo_analista = df_finalizados.groupby('USUÁRIO QUE CONCLUIU A TAREFA').agg(
-            Tempo_Total=('TEMPO MÉDIO OPERACIONAL', 'sum'),  # Soma total do tempo por analista
-            Total_Tarefas=('SITUAÇÃO DA TAREFA', 'count')  # Total de tarefas finalizadas ou canceladas por analista
-        ).reset_index()
-
-        # Calcula o TMO (Tempo Médio Operacional) como média
-        df_tmo_analista['TMO'] = df_tmo_analista['Tempo_Total'] / df_tmo_analista['Total_Tarefas']
-
-        # Formata o tempo médio no formato de minutos e segundos
-        df_tmo_analista['TMO_Formatado'] = df_tmo_analista['TMO'].apply(format_timedelta)
-        return df_tmo_analista[['USUÁRIO QUE CONCLUIU A TAREFA', 'TMO_Formatado', 'TMO']]
-
     # Verifica qual opção foi escolhida no dropdown
     if opcao_selecionada == "Visão Geral":
         st.header("Visão Geral")
             # Adiciona filtros de datas 
-        min_date = df_total['DATA DE CONCLUSÃO DA TAREFA'].min().date() if not df_total.empty else datetime.today().date()
-        max_date = df_total['DATA DE CONCLUSÃO DA TAREFA'].max().date() if not df_total.empty else datetime.today().date()
-
         col1, col2 = st.columns(2)
         with col1:
-            data_inicial = st.date_input("Data Inicial", min_date)
+            data_inicial = st.date_input("Data Inicial", inicio_padrao, help=f"Histórico disponível desde {min_date:%d/%m/%Y}")
         with col2:
             data_final = st.date_input("Data Final", max_date)
 
         if data_inicial > data_final:
             st.sidebar.error("A data inicial não pode ser posterior à data final!")
 
+        df_total = carregar_periodo(usuario_logado, indice, data_inicial, data_final)
         df_total = df_total[(df_total['DATA DE CONCLUSÃO DA TAREFA'].dt.date >= data_inicial) & (df_total['DATA DE CONCLUSÃO DA TAREFA'].dt.date <= data_final)]
-
-        total_finalizados = len(df_total[df_total['SITUAÇÃO DA TAREFA'] == 'Finalizada'])
-        total_reclass = len(df_total[df_total['SITUAÇÃO DA TAREFA'] == 'Cancelada'])
-        # Verifique se o denominador não é zero
-        if (total_finalizados + total_reclass) > 0:
-            # Se houver cadastros finalizados ou reclassificados, calcula o tempo médio
-            tempo_medio = (df_total[df_total['SITUAÇÃO DA TAREFA'] == 'Finalizada']['TEMPO MÉDIO OPERACIONAL'].sum() + 
-                        df_total[df_total['SITUAÇÃO DA TAREFA'] == 'Cancelada']['TEMPO MÉDIO OPERACIONAL'].sum()) / (total_finalizados + total_reclass)
-        else:
-            # Se não houver cadastros finalizados ou reclassificados, define o tempo médio como zero ou outro valor padrão
-            tempo_medio = pd.Timedelta(0)  # ou "0 min"
+        analistas_periodo = analistas_do_periodo(indice, df_total)
+
+        # Totais, séries diárias e TMO por analista do período (já calculados pelo aquecimento do login na visão padrão)
+        agregados = agregados_em_cache(('visao_geral', versao, data_inicial, data_final), lambda: calcular_visao_geral(df_total))
+        total_finalizados = agregados['total_finalizados']
+        total_reclass = agregados['total_reclass']
+        tempo_medio = agregados['tempo_medio']
+
+        # Figuras que só dependem do período começam a ser montadas em paralelo enquanto o restante da página é exibido
+        figuras = construir_em_paralelo({
+            'produtividade': lambda: figura_em_cache(
+                ('produtividade', versao, data_inicial, data_final),
+                lambda: grafico_produtividade(agregados['df_produtividade'], custom_colors)
+            ),
+            'tmo_equipe': lambda: figura_em_cache(
+                ('tmo_equipe', versao, data_inicial, data_final),
+                lambda: grafico_tmo_equipe(agregados['df_tmo'], custom_colors)
+            ),
+            'status': lambda: grafico_pizza(
+                ['Subsídio Parcial', 'Fora do Escopo', 'Subsídio Completo'],
+                [agregados['total_parcial'], agregados['total_nao_tratada'], agregados['total_completa']],
+                custom_colors
+            ),
+            'tmo_analista': lambda: grafico_tmo_por_analista(agregados['df_tmo_analista'], custom_colors)
+        })
 
         # with st.container(border=True):
         #     col1, col2, col3 = st.columns(3)
@@ -255,9 +206,14 @@ def dashboard():
         with col4:
             with st.container(border=True):
                 st.metric("Tempo Médio por Cadastro", format_timedelta(tempo_medio))
-        
-        df_produtividade = calcular_produtividade_diaria(df_total)
 
+        # Percentis do tempo operacional no período, calculados juntando os esboços de quantis diários
+        percentis = percentis_tmo(rollups, data_inicial, data_final)
+        for coluna, (rotulo, quantil) in zip(st.columns(3), [("TMO p50", 0.5), ("TMO p90", 0.9), ("TMO p99", 0.99)]):
+            with coluna:
+                with st.container(border=True):
+                    st.metric(rotulo, format_timedelta(percentis[quantil]))
+        
         # melhor_dia = df_produtividade.loc[df_produtividade['Produtividade'].idxmax()]
         # with col1:
         #     st.success("Melhor Dia de Produtividade: " + str(melhor_dia['Dia']) + " - " + str(melhor_dia['Produtividade']) + " Cadastros")
@@ -271,92 +227,48 @@ def dashboard():
         with col1:      
             with st.container(border=True):
                 st.subheader("Produtividade Diária")
-                fig_produtividade = px.line(
-                    df_produtividade,
-                    x='Dia',
-                    y='Produtividade',
-                    color_discrete_sequence=custom_colors,
-                    labels={'Produtividade': 'Total de Cadastros'},
-                    line_shape='linear',
-                    markers=True
-                )
-                fig_produtividade.update_traces(
-                    hovertemplate='Dia = %{x|%d/%m/%Y}<br>Produtividade = %{y}'
-                )
-                st.plotly_chart(fig_produtividade)
+                st.plotly_chart(figuras['produtividade'].result())
 
         with col2:
             with st.container(border=True):
                 st.subheader("TMO por Dia da Equipe")
-                df_tmo = calcular_tmo_por_dia_geral(df_total)
-                fig_tmo = px.line(
-                    df_tmo,
-                    x='Dia',
-                    y=df_tmo['TMO'].dt.total_seconds() / 60,  # Converte TMO para minutos
-                    labels={'y': 'Tempo Médio Operacional (min)', 'Dia': 'Data'},
-                    line_shape='linear',
-                    markers=True,
-                    color_discrete_sequence=custom_colors
-                )
-                fig_tmo.update_traces(
-                    hovertemplate='Data = %{x|%d/%m/%Y}<br>TMO = %{text}',
-                    text=df_tmo['TMO_Formatado']
-                )
-                st.plotly_chart(fig_tmo)
-        
-        total_completa = len(df_total[df_total['FINALIZAÇÃO'] == 'Subsídio Completo'])
-        total_parcial = len(df_total[df_total['FINALIZAÇÃO'] == 'Subsídio Parcial'])
-        total_nao_tratada = len(df_total[df_total['FINALIZAÇÃO'] == 'Fora do Escopo'])
+                st.plotly_chart(figuras['tmo_equipe'].result())
 
+        with st.container(border=True):
+            # Médias móveis mantidas nos agregados: as janelas do início do período também usam os dias anteriores a ele
+            st.subheader("Produtividade e TMO Móveis (7 e 30 dias)")
+            opcao_moveis = st.selectbox('Equipe ou analista', ["Equipe"] + analistas_periodo, key='janelas_moveis_analista')
+            df_moveis = series_moveis(rollups['janelas'], data_inicial, data_final, None if opcao_moveis == "Equipe" else opcao_moveis)
+            col1, col2 = st.columns(2)
+            with col1:
+                st.plotly_chart(grafico_produtividade_movel(df_moveis, custom_colors))
+            with col2:
+                st.plotly_chart(grafico_tmo_movel(df_moveis, custom_colors))
+        
         # Gráfico de pizza para o status
         with st.container(border=True):
             st.subheader("Status de Finalização das Tarefas")
-            fig_status = px.pie(
-                names=['Subsídio Parcial', 'Fora do Escopo', 'Subsídio Completo'],
-                values=[total_parcial, total_nao_tratada, total_completa],
-                color_discrete_sequence=custom_colors
-            )
-            fig_status.update_traces(
-                hovertemplate='Tarefas %{label} = %{value}<extra></extra>',
-            )
-            fig_status.update_layout(
-                legend=dict(
-                    orientation="h",
-                    yanchor="top",
-                    y=-0.1,
-                    xanchor="center",
-                    x=0.5
-                )
-            )
-            st.plotly_chart(fig_status)
+            st.plotly_chart(figuras['status'].result())
+
+        with st.container(border=True):
+            # Mapa de calor de conclusões por dia da semana e hora, a partir das contagens por hora guardadas nos agregados
+            st.subheader("Conclusões por Dia da Semana e Hora")
+            analistas_mapa = ["Todos"] + analistas_periodo
+            analista_mapa = st.selectbox('Analista', analistas_mapa, key='mapa_calor_analista')
+            matriz_horas = mapa_calor_semana(rollups, data_inicial, data_final, None if analista_mapa == "Todos" else analista_mapa)
+            st.plotly_chart(grafico_mapa_calor(matriz_horas, custom_colors))
 
         with st.container(border=True):
-            # Calcula o TMO por analista e exibe o gráfico
-            df_tmo_analista = calcular_tmo_por_analista(df_total)
-            
             # Gráfico de barras de TMO por analista em minutos
+            df_tmo_analista = agregados['df_tmo_analista']
             st.subheader("Tempo Médio de Operação (TMO) por Analista")
-            fig_tmo_analista = px.bar(
-                df_tmo_analista,
-                x='USUÁRIO QUE CONCLUIU A TAREFA',
-                y=df_tmo_analista['TMO'].dt.total_seconds() / 60,  # TMO em minutos
-                title='TMO por Analista (em minutos e segundos)',
-                labels={'y': 'TMO (min)', 'USUÁRIO QUE CONCLUIU A TAREFA': 'Analista'},
-                text=df_tmo_analista['TMO_Formatado'],
-                color_discrete_sequence=custom_colors
-            )
-            fig_tmo_analista.update_traces(
-                textposition='outside',  # Exibe o tempo formatado fora das barras
-                hovertemplate='Analista = %{x}<br>TMO = %{text}<extra></extra>',
-                text=df_tmo_analista['TMO_Formatado']
-            )
-            st.plotly_chart(fig_tmo_analista)
+            st.plotly_chart(figuras['tmo_analista'].result())
 
         with st.container(border=True):
             # Gráfico de ranking dinâmico
             st.subheader("Ranking de Pordutividade")
             # Multiselect para selecionar/remover analistas do gráfico
-            analistas_selecionados = st.multiselect('Selecione os analistas', df_total['USUÁRIO QUE CONCLUIU A TAREFA'].unique(), default=df_total['USUÁRIO QUE CONCLUIU A TAREFA'].unique())
+            analistas_selecionados = st.multiselect('Selecione os analistas', analistas_periodo, default=analistas_periodo)
             df_total_analistas_selecionados = df_total[df_total['USUÁRIO QUE CONCLUIU A TAREFA'].isin(analistas_selecionados)]
             df_ranking = df_total_analistas_selecionados.groupby('USUÁRIO QUE CONCLUIU A TAREFA').agg(
                 Finalizado=('SITUAÇÃO DA TAREFA', lambda x: x[x == 'Finalizada'].count()),
@@ -367,9 +279,65 @@ def dashboard():
             df_ranking.index += 1
             df_ranking.index.name = 'Posição'
             df_ranking = df_ranking.rename(columns={'USUÁRIO QUE CONCLUIU A TAREFA': 'Usuário', 'Finalizado': 'Finalizado', 'Cancelada': 'Cancelada'})
-            st.dataframe(df_ranking.style.format({'Finalizado': '{:.0f}', 'Cancelado': '{:.0f}'}), width=1080)
+            exibir_tabela(df_ranking, 'ranking', hide_index=False, column_config={
+                'Finalizado': st.column_config.NumberColumn(format='%d'),
+                'Cancelado': st.column_config.NumberColumn(format='%d')
+            })
+
+        # Exportação das linhas e tabelas do período filtrado
+        exibir_exportacao({
+            'Tarefas': df_total,
+            'Produtividade Diária': agregados['df_produtividade'],
+            'TMO Diário': agregados['df_tmo'],
+            'TMO por Analista': df_tmo_analista,
+            'Ranking': df_ranking
+        }, 'visao_geral')
+
+    elif opcao_selecionada == "Comparativo entre Equipes":
+        st.header("Comparativo entre Equipes")
+        # Usa os agregados salvos de cada equipe; só as equipes com dados alterados são reprocessadas (em paralelo)
+        rollups_equipes, falhas_equipes = rollups_das_equipes(listar_usuarios())
+        for equipe, erro in falhas_equipes.items():
+            st.warning(f"Não foi possível carregar os dados da equipe {equipe}; ela ficou fora do comparativo. ({erro})")
+        periodo = periodo_equipes(rollups_equipes) or (datetime.today().date(), datetime.today().date())
+
+        col1, col2 = st.columns(2)
+        with col1:
+            data_inicial = st.date_input("Data Inicial", periodo[0])
+        with col2:
+            data_final = st.date_input("Data Final", periodo[1])
+
+        if data_inicial > data_final:
+            st.error("A data inicial não pode ser posterior à data final!")
+
+        comparativo = comparar_equipes(rollups_equipes, data_inicial, data_final)
+        if comparativo.empty:
+            st.info("Nenhum dado encontrado para as equipes.")
+        else:
+            df_equipes = comparativo[comparativo['Equipe'] != 'Todas as Equipes']
+
+            col1, col2 = st.columns(2)
+            with col1:
+                with st.container(border=True):
+                    st.subheader("Produtividade por Equipe")
+                    st.plotly_chart(grafico_produtividade_equipes(df_equipes, custom_colors))
+            with col2:
+                with st.container(border=True):
+                    st.subheader("TMO por Equipe")
+                    st.plotly_chart(grafico_tmo_equipes(df_equipes, custom_colors))
+
+            with st.container(border=True):
+                st.subheader("Status de Finalização por Equipe")
+                st.plotly_chart(grafico_finalizacoes_equipes(df_equipes, FINALIZACOES, custom_colors))
+
+            with st.container(border=True):
+                st.subheader("Resumo por Equipe")
+                exibir_tabela(comparativo, 'comparativo_equipes')
+
+            exibir_exportacao({'Resumo por Equipe': comparativo}, 'comparativo')
 
     elif opcao_selecionada == "Diário de Bordo":
+        from diario import diario  # Importa o diário de bordo só quando a visão é aberta
         diario()
         
     # elif opcao_selecionada == "Editar Dados":
@@ -379,38 +347,50 @@ def dashboard():
         st.header("Métricas Individuais")
         # Adiciona filtros de datas 
         st.subheader("Filtro por Data")
-        min_date = df_total['DATA DE CONCLUSÃO DA TAREFA'].min().date() if not df_total.empty else datetime.today().date()
-        max_date = df_total['DATA DE CONCLUSÃO DA TAREFA'].max().date() if not df_total.empty else datetime.today().date()
-
         col1, col2 = st.columns(2)
         with col1:
-            data_inicial = st.date_input("Data Inicial", min_date)
+            data_inicial = st.date_input("Data Inicial", inicio_padrao, help=f"Histórico disponível desde {min_date:%d/%m/%Y}")
         with col2:
             data_final = st.date_input("Data Final", max_date)
 
         if data_inicial > data_final:
             st.error("A data inicial não pode ser posterior à data final!")
 
+        df_total = carregar_periodo(usuario_logado, indice, data_inicial, data_final)
         df_total = df_total[(df_total['DATA DE CONCLUSÃO DA TAREFA'].dt.date >= data_inicial) & (df_total['DATA DE CONCLUSÃO DA TAREFA'].dt.date <= data_final)]
-        analista_selecionado = st.selectbox('Selecione o analista', df_total['USUÁRIO QUE CONCLUIU A TAREFA'].unique())
+        analista_selecionado = st.selectbox('Selecione o analista', analistas_do_periodo(indice, df_total))
         df_analista = df_total[df_total['USUÁRIO QUE CONCLUIU A TAREFA'] == analista_selecionado].copy()
+        tabelas_exportacao = {'Tarefas do Analista': df_analista}
 
-        total_geral_analista = len(df_analista[(df_analista['SITUAÇÃO DA TAREFA'] == 'Finalizada') | (df_analista['SITUAÇÃO DA TAREFA'] == 'Cancelada')])
-        total_finalizados_analista = len(df_analista[df_analista['SITUAÇÃO DA TAREFA'] == 'Finalizada'])
-        total_reclass_analista = len(df_analista[df_analista['SITUAÇÃO DA TAREFA'] == 'Cancelada'])
         # Calcula o TMO, quantidade de finalizados e reclassificações apenas para o analista especifico
-        total_finalizados = len(df_analista[df_analista['SITUAÇÃO DA TAREFA'] == 'Finalizada'])
-        total_reclass = len(df_analista[df_analista['SITUAÇÃO DA TAREFA'] == 'Cancelada'])
-        # Verifique se o denominador não é zero
-        if (total_finalizados + total_reclass) > 0:
-            # Se houver cadastros finalizados ou reclassificados, calcula o tempo médio
-            tempo_medio_analista = (df_analista[df_analista['SITUAÇÃO DA TAREFA'] == 'Finalizada']['TEMPO MÉDIO OPERACIONAL'].sum() + 
-                        df_analista[df_analista['SITUAÇÃO DA TAREFA'] == 'Cancelada']['TEMPO MÉDIO OPERACIONAL'].sum()) / (total_finalizados + total_reclass)
-        else:
-            # Se não houver cadastros finalizados ou reclassificados, define o tempo médio como zero ou outro valor padrão
-            tempo_medio_analista = pd.Timedelta(0)  # ou "0 min"
-
-        tmo_equipe = df_total[df_total['SITUAÇÃO DA TAREFA'] == 'Finalizada']['TEMPO MÉDIO OPERACIONAL'].mean()
+        totais_analista = calcular_totais_analista(df_analista)
+        total_geral_analista = totais_analista['total_geral']
+        total_finalizados_analista = totais_analista['total_finalizados']
+        total_reclass_analista = totais_analista['total_reclass']
+        tempo_medio_analista = totais_analista['tempo_medio']
+
+        tmo_equipe = calcular_tmo_equipe(df_total)
+
+        # Tabelas e figuras do analista começam a ser montadas em paralelo enquanto os totais são exibidos
+        # (calcular_tmo_por_dia_geral acrescenta a coluna 'Dia', por isso recebe uma cópia)
+        tem_fila = 'FILA' in df_analista.columns
+        filas_feitas_analista = df_analista['FILA'].dropna().value_counts() if tem_fila else None
+        resultados = construir_em_paralelo({
+            'filas': lambda: calcular_filas_analista(df_analista) if tem_fila else None,
+            'percentis_fila': lambda: percentis_por_fila(rollups, data_inicial, data_final, analista_selecionado),
+            'protocolos': lambda: calcular_protocolos_analista(df_analista) if not df_analista.empty and 'NÚMERO DO PROTOCOLO' in df_analista.columns and tem_fila else None,
+            'pizza_status': lambda: grafico_pizza(
+                ['Subsídio Parcial', 'Fora do Escopo', 'Subsídio Completo'],
+                [len(df_analista[df_analista['FINALIZAÇÃO'] == finalizacao]) for finalizacao in ['Subsídio Parcial', 'Fora do Escopo', 'Subsídio Completo']],
+                custom_colors
+            ),
+            'pizza_filas': lambda: grafico_pizza(filas_feitas_analista.index, filas_feitas_analista.to_numpy(), custom_colors) if tem_fila else None,
+            'tmo_dia': lambda: figura_em_cache(
+                ('tmo_analista_dia', versao, data_inicial, data_final, analista_selecionado),
+                lambda: grafico_tmo_analista_por_dia(calcular_tmo_por_dia_geral(df_analista.copy()), custom_colors)
+            ),
+            'pontos_de_atencao': lambda: get_points_of_attention(df_analista, rollups['baselines'])
+        })
         
         col1, col2, col3, col4 = st.columns(4)
 
@@ -442,85 +422,49 @@ def dashboard():
                 pass
             else:
                 st.warning("Atenção! O tempo médio por cadastro é maior do que o TMO da equipe", icon="⚠️")
+
+        # Percentis do tempo operacional do analista no período
+        percentis_analista = percentis_tmo(rollups, data_inicial, data_final, analista_selecionado)
+        for coluna, (rotulo, quantil) in zip(st.columns(3), [("TMO p50", 0.5), ("TMO p90", 0.9), ("TMO p99", 0.99)]):
+            with coluna:
+                with st.container(border=True):
+                    st.metric(rotulo, format_timedelta(percentis_analista[quantil]))
         
         with st.container(border=True):
             # Agrupar por 'FILA' e calcular a quantidade e o TMO médio para cada fila do analista
-            if 'FILA' in df_analista.columns:
-                # Filtrar apenas as tarefas finalizadas para cálculo do TMO
-                filas_finalizadas_analista = df_analista[df_analista['SITUAÇÃO DA TAREFA'] == 'Finalizada']
-                
-                # Agrupa por 'FILA' e calcula a quantidade e o TMO médio para cada fila
-                carteiras_analista = filas_finalizadas_analista.groupby('FILA').agg(
-                    Quantidade=('FILA', 'size'),
-                    TMO_médio=('TEMPO MÉDIO OPERACIONAL', 'mean')
-                ).reset_index()
+            if tem_fila:
+                carteiras_analista = resultados['filas'].result()
+                tabelas_exportacao['Filas'] = carteiras_analista
 
-                # Converte o TMO médio para minutos e segundos
-                carteiras_analista['TMO_médio'] = carteiras_analista['TMO_médio'].apply(format_timedelta)
-
-                # Renomeia as colunas
-                carteiras_analista = carteiras_analista.rename(columns={'FILA': 'Fila', 'Quantidade': 'Quantidade', 'TMO_médio': 'TMO Médio por Fila'})
-                
-                # Configura o estilo do DataFrame para alinhar o conteúdo à esquerda
-                styled_df = carteiras_analista.style.format({'Quantidade': '{:.0f}', 'TMO Médio': '{:s}'}).set_properties(**{'text-align': 'left'})
-                styled_df = styled_df.set_table_styles([dict(selector='th', props=[('text-align', 'left')])])
-
-                # Exibe a tabela com as colunas Tarefa, Quantidade e TMO Médio
+                # Exibe a tabela com as colunas Tarefa, Quantidade e TMO Médio (o TMO vai em minutos, ordenável)
                 st.subheader(f"Filas Realizadas por {analista_selecionado}")
-                st.dataframe(styled_df, hide_index=True, width=1080)
+                exibir_tabela(carteiras_analista, 'filas_analista', column_config={
+                    'Quantidade': st.column_config.NumberColumn(format='%d')
+                })
             else:
                 st.write("A coluna 'FILA' não foi encontrada no dataframe.")
                 carteiras_analista = pd.DataFrame({'Fila': [], 'Quantidade': [], 'TMO Médio por': []})
-                styled_df = carteiras_analista.style.format({'Quantidade': '{:.0f}', 'TMO Médio': '{:s}'}).set_properties(**{'text-align': 'left'})
-                styled_df = styled_df.set_table_styles([dict(selector='th', props=[('text-align', 'left')])])
-                st.dataframe(styled_df, hide_index=True, width=1080)            
+                exibir_tabela(carteiras_analista, 'filas_analista')
+
+        with st.container(border=True):
+            # Percentis do tempo operacional por fila, para enxergar a cauda além da média
+            st.subheader(f"Percentis do Tempo Operacional por Fila - {analista_selecionado}")
+            tabelas_exportacao['Percentis por Fila'] = resultados['percentis_fila'].result()
+            exibir_tabela(tabelas_exportacao['Percentis por Fila'], 'percentis_fila_analista',
+                          column_config={'Quantidade': st.column_config.NumberColumn(format='%d')})
                     
         with st.container(border=True):
                 # Verificar se o DataFrame possui as colunas necessárias
-                if not df_analista.empty and 'NÚMERO DO PROTOCOLO' in df_analista.columns and 'FILA' in df_analista.columns:
-                    # Filtrar apenas as tarefas finalizadas para cálculo do TMO
-                    filas_finalizadas_analista = df_analista[df_analista['SITUAÇÃO DA TAREFA'] == 'Finalizada']
-                    
-                    # Contar a quantidade de pastas preenchidas para cada protocolo
-                    pasta_columns = [col for col in filas_finalizadas_analista.columns if col.startswith('PASTA')]
-                    filas_finalizadas_analista['Quantidade de Pastas'] = filas_finalizadas_analista[pasta_columns].notna().sum(axis=1)
-
-                    # Verificar a quantidade de requisições
-                    filas_finalizadas_analista['Número de Requisições'] = filas_finalizadas_analista['NÚMERO REQUISIÇÃO'].notna().astype(int)
-                    
-                    filas_finalizadas_analista['ID Projuris'] = filas_finalizadas_analista['ID PROJURIS'].notna().astype(int)
-
-                    # Agrupar os dados por 'NÚMERO DO PROTOCOLO' e 'FILA'
-                    protocolos_analista = filas_finalizadas_analista.groupby(['NÚMERO DO PROTOCOLO', 'FILA']).agg(
-                        Quantidade_de_Pastas=('Quantidade de Pastas', 'first'),
-                        Número_de_Requisições=('Número de Requisições', 'first'),
-                        ID_Projuris=('ID Projuris', 'first'),
-                        TMO_médio=('TEMPO MÉDIO OPERACIONAL', 'mean')
-                    ).reset_index()
-
-                    # Ajustar a quantidade de pastas para exibir 0 caso não haja pastas
-                    protocolos_analista['Quantidade_de_Pastas'] = protocolos_analista['Quantidade_de_Pastas'].fillna(0)
-
-                    # Converter o TMO médio para minutos e segundos
-                    protocolos_analista['TMO_médio'] = protocolos_analista['TMO_médio'].apply(format_timedelta)
-
-                    # Renomear as colunas para exibição
-                    protocolos_analista = protocolos_analista.rename(columns={
-                        'NÚMERO DO PROTOCOLO': 'Número do Protocolo',
-                        'FILA': 'Fila',
-                        'Quantidade_de_Pastas': 'Quantidade de Pastas',
-                        'Número_de_Requisições': 'Número de Requisições',
-                        'ID_Projuris': 'ID Projuris',
-                        'TMO_médio': 'Tempo de Análise por Protocolo'
-                    })
-
-                    # Configurar o estilo do DataFrame para alinhamento à esquerda
-                    styled_df = protocolos_analista.style.format({'Quantidade de Pastas': '{:.0f}', 'Número de Requisições': '{:.0f}', 'Tempo de Análise por Protocolo': '{:s}'}).set_properties(**{'text-align': 'left'})
-                    styled_df = styled_df.set_table_styles([dict(selector='th', props=[('text-align', 'left')])])
+                protocolos_analista = resultados['protocolos'].result()
+                if protocolos_analista is not None:
+                    tabelas_exportacao['Protocolos'] = protocolos_analista
 
-                    # Exibir a tabela com as colunas solicitadas
+                    # Exibir a tabela com as colunas solicitadas (o tempo de análise vai em minutos, ordenável)
                     st.subheader(f"Quantidade de Pastas e Requisições por Protocolo - {analista_selecionado}")
-                    st.dataframe(styled_df, hide_index=True, width=1080)
+                    exibir_tabela(protocolos_analista, 'protocolos_analista', column_config={
+                        'Quantidade de Pastas': st.column_config.NumberColumn(format='%d'),
+                        'Número de Requisições': st.column_config.NumberColumn(format='%d')
+                    })
                 else:
                     st.write("Não há dados suficientes para exibir a tabela de protocolos por fila.")
 
@@ -539,104 +483,44 @@ def dashboard():
 
         # Gráficos de pizza lado a lado
         col1, col2 = st.columns(2)
-        total_finalizacao_completa_analista = len(df_analista[df_analista['FINALIZAÇÃO'] == 'Subsídio Completo'])
-        total_finalizacao_parcial_analista = len(df_analista[df_analista['FINALIZAÇÃO'] == 'Subsídio Parcial'])
-        total_finalizacao_nao_tratada_analista = len(df_analista[df_analista['FINALIZAÇÃO'] == 'Fora do Escopo'])
         
         # Gráfico de pizza para o status do analista selecionado
         with col1:
             with st.container(border=True):
                 st.subheader(f"FinalIzações de {analista_selecionado}")
-                fig_status_analista = px.pie(
-                    names=['Subsídio Parcial', 'Fora do Escopo', 'Subsídio Completo'],
-                    values=[total_finalizacao_parcial_analista, total_finalizacao_nao_tratada_analista, total_finalizacao_completa_analista],
-                    color_discrete_sequence=custom_colors
-                )
-                
-                fig_status_analista.update_traces(
-                    hovertemplate='Tarefas %{label} = %{value}<extra></extra>',
-                )
-
-                fig_status_analista.update_layout(
-                    legend=dict(
-                        orientation="h",
-                        yanchor="top",
-                        y=-0.1,
-                        xanchor="center",
-                        x=0.5
-                    )
-                )
-
-                st.plotly_chart(fig_status_analista)
+                st.plotly_chart(resultados['pizza_status'].result())
 
         # Gráfico de pizza para as tarefas feitas pelo analista
         with col2:
             with st.container(border=True):
                 st.subheader(f"Filas Realizadas por {analista_selecionado}")
                 
-                if 'FILA' in df_analista.columns:
-                    filas_feitas_analista = df_analista['FILA'].dropna().value_counts().reset_index()
-                    filas_feitas_analista.columns = ['Tarefa', 'Quantidade']
-
-                    fig_filas_feitas_analista = px.pie(
-                        names=filas_feitas_analista['Tarefa'],
-                        values=filas_feitas_analista['Quantidade'],
-                        color_discrete_sequence=custom_colors
-                    )
-
-                    fig_filas_feitas_analista.update_traces(
-                        hovertemplate='Tarefas %{label} = %{value}<extra></extra>',
-                    )
-
-                    fig_filas_feitas_analista.update_layout(
-                        legend=dict(
-                            orientation="h",
-                            yanchor="top",
-                            y=-0.1,
-                            xanchor="center",
-                            x=0.5
-                        )
-                    )
-
-                    st.plotly_chart(fig_filas_feitas_analista)
+                if tem_fila:
+                    st.plotly_chart(resultados['pizza_filas'].result())
                 else:
                     st.write("A coluna 'TAREFA' não foi encontrada no dataframe.")
 
         # Gráfico de barras para o tempo médio do analista por dia
         with st.container(border=True):
             st.subheader(f"Tempo Médio por Dia - {analista_selecionado}")
-            df_tmo_analista = calcular_tmo_por_dia(df_analista)
-
-            # Converte a coluna "TMO" para minutos e segundos
-            df_tmo_analista['TMO_segundos'] = df_tmo_analista['TMO'].apply(lambda x: int(x.split(' min')[0]) * 60 + int(x.split('s')[0].split(' min')[1]))
-            df_tmo_analista['TMO_minutos'] = df_tmo_analista['TMO_segundos'] / 60
-
-            # Cria o gráfico de barras
-            fig_tmo_analista = px.bar(
-                df_tmo_analista, x='Dia', 
-                y='TMO_minutos', 
-                labels={'y': 'TMO (min)', 'Dia': 'Dia'},
-                text=df_tmo_analista['TMO'],  # Exibe o tempo formatado fora das barras
-                color_discrete_sequence=custom_colors
-            )
-            fig_tmo_analista.update_traces(
-                hovertemplate='Data = %{x|%d/%m/%Y}<br>TMO = %{text}',
-                text=df_tmo_analista['TMO'],  # Exibe o tempo formatado fora das barras
-                textfont_color='white'  # Define a cor do texto como branco
-            )
-            st.plotly_chart(fig_tmo_analista)
+
+            # Cria o gráfico de barras (agrupado por semana ou mês em períodos longos)
+            st.plotly_chart(resultados['tmo_dia'].result())
     
         # st.write(df_tmo_analista)
 
-        # # Tabela de pontos de atenção
-        # st.subheader("Pontos de Atenção")
-        # pontos_de_atencao_analista = get_points_of_attention(df_analista)
-        # if not pontos_de_atencao_analista.empty:
-        #     st.write(pontos_de_atencao_analista[['Protocolo', 'Tempo de Análise', 'Próximo']].assign(
-        #         **{'Tempo de Análise': pontos_de_atencao_analista['Tempo de Análise'].apply(format_timedelta)}
-        #     ).to_html(index=False, justify='left'), unsafe_allow_html=True)
-        # else:
-        #     st.write("Nenhum ponto de atenção identificado para este analista.")    
+        # Tabela de pontos de atenção: protocolos com tempo muito acima da mediana/MAD da fila (base guardada nos agregados)
+        with st.container(border=True):
+            st.subheader("Pontos de Atenção")
+            pontos_de_atencao_analista = resultados['pontos_de_atencao'].result()
+            tabelas_exportacao['Pontos de Atenção'] = pontos_de_atencao_analista
+            if not pontos_de_atencao_analista.empty:
+                exibir_tabela(pontos_de_atencao_analista, 'pontos_de_atencao',
+                              column_config={'Data de Conclusão': st.column_config.DatetimeColumn(format='DD/MM/YYYY HH:mm')})
+            else:
+                st.write("Nenhum ponto de atenção identificado para este analista.")
+
+        exibir_exportacao(tabelas_exportacao, 'metricas_individuais')
 
     # # Botão para salvar a planilha atualizada
     # if st.sidebar.button("Salvar Dados"):
@@ -25,6 +25,54 @@ def save_indisponibilidade(usuario, inicio, fim, duracao):
     with open(file_path, 'a', encoding='utf-8') as file:
         file.write(f"{inicio} - {fim} | Duração: {duracao}\n")
 
+# Função para carregar o horário de início do timer salvo no servidor (sobrevive a recarregamentos da página)
+def load_timer(usuario):
+    file_path = f'timer_{usuario}.txt'
+    if os.path.exists(file_path):
+        with open(file_path, 'r', encoding='utf-8') as file:
+            try:
+                return datetime.fromisoformat(file.read().strip())
+            except ValueError:
+                return None
+    return None
+
+# Função para salvar o horário de início do timer
+def save_timer(usuario, inicio):
+    file_path = f'timer_{usuario}.txt'
+    with open(file_path, 'w', encoding='utf-8') as file:
+        file.write(inicio.isoformat())
+
+# Função para remover o timer salvo quando ele é parado
+def clear_timer(usuario):
+    file_path = f'timer_{usuario}.txt'
+    if os.path.exists(file_path):
+        os.remove(file_path)
+
+# Fragmento que atualiza apenas o tempo passado a cada segundo, sem reexecutar a dashboard
+@st.fragment(run_every="1s")
+def tempo_passado_timer(inicio):
+    tempo_passado = datetime.now() - inicio
+    st.metric("Tempo passado", str(tempo_passado).split('.')[0])
+
+# Fragmento com os controles do timer de indisponibilidade, os cliques reexecutam só este trecho
+@st.fragment
+def timer_indisponibilidade(usuario):
+    if st.session_state.start_time is None:
+        st.session_state.start_time = load_timer(usuario)
+
+    if st.button("Iniciar Timer"):
+        st.session_state.start_time = datetime.now()
+        save_timer(usuario, st.session_state.start_time)
+
+    if st.session_state.start_time:
+        tempo_passado_timer(st.session_state.start_time)
+        if st.button("Parar Timer"):
+            tempo_passado = datetime.now() - st.session_state.start_time
+            save_indisponibilidade(usuario, st.session_state.start_time.strftime('%H:%M'), datetime.now().strftime('%H:%M'), str(tempo_passado))
+            clear_timer(usuario)
+            st.session_state.start_time = None
+            st.success("Tempo de indisponibilidade salvo com sucesso!")
+
 # Função para exibir e adicionar anotações no diário de bordo
 def diario():
     usuario_logado = st.session_state.usuario_logado  # Obtém o usuário logado
@@ -68,16 +116,7 @@ def diario():
     if "start_time" not in st.session_state:
         st.session_state.start_time = None
     
-    if st.button("Iniciar Timer"):
-        st.session_state.start_time = datetime.now()
-    
-    if st.session_state.start_time:
-        tempo_passado = datetime.now() - st.session_state.start_time
-        st.metric("Tempo passado", f"{tempo_passado.total_seconds() / 3600:.2f} horas")
-        if st.button("Parar Timer"):
-            save_indisponibilidade(usuario_logado, st.session_state.start_time.strftime('%H:%M'), datetime.now().strftime('%H:%M'), str(tempo_passado))
-            st.success("Tempo de indisponibilidade salvo com sucesso!")
-            st.session_state.start_time = None
+    timer_indisponibilidade(usuario_logado)
 
     # # Área para registrar tempo de indisponibilidade
     # st.subheader("Registrar Indisponibilidade do Sistema")
@@ -0,0 +1,426 @@
+import argparse
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+import metricas
+from dados import convert_to_timedelta_for_calculations, convert_to_datetime_for_calculations
+from janelas import calcular_janelas
+from dados_sinteticos import gerar_planilha
+
+# Teste de equivalência das métricas: as funções de referência abaixo são o código do dashboard.py da versão
+# c94bd65 (antes das otimizações), copiado sem alteração; os trechos que lá ficavam dentro de dashboard() foram
+# apenas colocados em funções. Cada implementação atual é executada lado a lado com a referência em dados gerados
+# e em casos limite, o resultado precisa ser idêntico ao que a dashboard exibia e o ganho de tempo é exibido. Exemplo:
+#   python equivalencia.py --linhas 100000
+
+# Referência: funções do dashboard.py da c94bd65 (não alterar)
+# Função para formatar timedelta no formato HH:MM:SS
+def referencia_format_timedelta(td):
+    if pd.isnull(td):
+        return "0 min"
+    total_seconds = int(td.total_seconds())
+    minutes, seconds = divmod(total_seconds, 60)
+    return f"{minutes} min {seconds}s"
+
+# Função para calcular o TMO por dia
+def referencia_calcular_tmo_por_dia(df):
+    df['Dia'] = pd.to_datetime(df['DATA DE CONCLUSÃO DA TAREFA']).dt.date
+    df_finalizados = df[df['SITUAÇÃO DA TAREFA'].isin(['Finalizada', 'Cancelada'])].copy()
+    
+    # Agrupando por dia
+    df_tmo = df_finalizados.groupby('Dia').agg(
+        Tempo_Total=('TEMPO MÉDIO OPERACIONAL', 'sum'),  # Soma total do tempo
+        Total_Finalizados_Cancelados=('SITUAÇÃO DA TAREFA', 'count')  # Total de tarefas finalizadas ou canceladas
+    ).reset_index()
+
+    # Calcula o TMO (Tempo Médio Operacional)
+    df_tmo['TMO'] = df_tmo['Tempo_Total'] / df_tmo['Total_Finalizados_Cancelados']
+    
+    # Formata o tempo médio no formato HH:MM:SS
+    df_tmo['TMO'] = df_tmo['TMO'].apply(referencia_format_timedelta)
+    return df_tmo[['Dia', 'TMO']]
+
+def referencia_calcular_tmo_por_dia_geral(df):
+    # Certifica-se de que a coluna de data está no formato correto
+    df['Dia'] = pd.to_datetime(df['DATA DE CONCLUSÃO DA TAREFA']).dt.date
+
+    # Filtra tarefas finalizadas ou canceladas, pois estas são relevantes para o cálculo do TMO
+    df_finalizados = df[df['SITUAÇÃO DA TAREFA'].isin(['Finalizada', 'Cancelada'])].copy()
+    
+    # Agrupamento por dia para calcular o tempo médio diário
+    df_tmo = df_finalizados.groupby('Dia').agg(
+        Tempo_Total=('TEMPO MÉDIO OPERACIONAL', 'sum'),  # Soma total do tempo por dia
+        Total_Finalizados_Cancelados=('SITUAÇÃO DA TAREFA', 'count')  # Total de tarefas finalizadas/canceladas por dia
+    ).reset_index()
+
+    # Calcula o TMO (Tempo Médio Operacional) diário
+    df_tmo['TMO'] = df_tmo['Tempo_Total'] / df_tmo['Total_Finalizados_Cancelados']
+    
+    # Remove valores nulos e formata o tempo médio para o gráfico
+    df_tmo['TMO'] = df_tmo['TMO'].fillna(pd.Timedelta(seconds=0))  # Preenche com zero se houver NaN
+    df_tmo['TMO_Formatado'] = df_tmo['TMO'].apply(referencia_format_timedelta)  # Formata para exibição
+    
+    return df_tmo[['Dia', 'TMO', 'TMO_Formatado']]
+
+def referencia_calcular_produtividade_diaria(df):
+    # Garante que a coluna 'Próximo' esteja em formato de data
+    df['Dia'] = df['DATA DE CONCLUSÃO DA TAREFA'].dt.date
+
+    # Agrupa e soma os status para calcular a produtividade
+    df_produtividade = df.groupby('Dia').agg(
+        Finalizado=('SITUAÇÃO DA TAREFA', lambda x: x[x == 'Finalizada'].count()),
+        Cancelada=('SITUAÇÃO DA TAREFA', lambda x: x[x == 'Cancelada'].count())
+    ).reset_index()
+
+    # Calcula a produtividade total
+    df_produtividade['Produtividade'] = + df_produtividade['Finalizado'] + df_produtividade['Cancelada']
+    return df_produtividade
+
+# Função aninhada em dashboard()
+def referencia_calcular_tmo_por_analista(df):
+    df_finalizados = df[df['SITUAÇÃO DA TAREFA'].isin(['Finalizada', 'Cancelada'])].copy()
+
+    # Agrupando por analista
+    df_tmo_analista = df_finalizados.groupby('USUÁRIO QUE CONCLUIU A TAREFA').agg(
+        Tempo_Total=('TEMPO MÉDIO OPERACIONAL', 'sum'),  # Soma total do tempo por analista
+        Total_Tarefas=('SITUAÇÃO DA TAREFA', 'count')  # Total de tarefas finalizadas ou canceladas por analista
+    ).reset_index()
+
+    # Calcula o TMO (Tempo Médio Operacional) como média
+    df_tmo_analista['TMO'] = df_tmo_analista['Tempo_Total'] / df_tmo_analista['Total_Tarefas']
+
+    # Formata o tempo médio no formato de minutos e segundos
+    df_tmo_analista['TMO_Formatado'] = df_tmo_analista['TMO'].apply(referencia_format_timedelta)
+    return df_tmo_analista[['USUÁRIO QUE CONCLUIU A TAREFA', 'TMO_Formatado', 'TMO']]
+
+# Trechos da Visão Geral em dashboard(), na mesma ordem (df_total já filtrado pelo período)
+def referencia_visao_geral(df_total):
+    total_finalizados = len(df_total[df_total['SITUAÇÃO DA TAREFA'] == 'Finalizada'])
+    total_reclass = len(df_total[df_total['SITUAÇÃO DA TAREFA'] == 'Cancelada'])
+    # Verifique se o denominador não é zero
+    if (total_finalizados + total_reclass) > 0:
+        # Se houver cadastros finalizados ou reclassificados, calcula o tempo médio
+        tempo_medio = (df_total[df_total['SITUAÇÃO DA TAREFA'] == 'Finalizada']['TEMPO MÉDIO OPERACIONAL'].sum() + 
+                    df_total[df_total['SITUAÇÃO DA TAREFA'] == 'Cancelada']['TEMPO MÉDIO OPERACIONAL'].sum()) / (total_finalizados + total_reclass)
+    else:
+        # Se não houver cadastros finalizados ou reclassificados, define o tempo médio como zero ou outro valor padrão
+        tempo_medio = pd.Timedelta(0)  # ou "0 min"
+
+    df_produtividade = referencia_calcular_produtividade_diaria(df_total)
+    df_tmo = referencia_calcular_tmo_por_dia_geral(df_total)
+
+    total_completa = len(df_total[df_total['FINALIZAÇÃO'] == 'Subsídio Completo'])
+    total_parcial = len(df_total[df_total['FINALIZAÇÃO'] == 'Subsídio Parcial'])
+    total_nao_tratada = len(df_total[df_total['FINALIZAÇÃO'] == 'Fora do Escopo'])
+
+    df_tmo_analista = referencia_calcular_tmo_por_analista(df_total)
+    return {
+        'total_finalizados': total_finalizados,
+        'total_reclass': total_reclass,
+        'tempo_medio': tempo_medio,
+        'df_produtividade': df_produtividade,
+        'df_tmo': df_tmo,
+        'df_tmo_analista': df_tmo_analista,
+        'total_completa': total_completa,
+        'total_parcial': total_parcial,
+        'total_nao_tratada': total_nao_tratada
+    }
+
+# Trecho das Métricas Individuais em dashboard(): totais do analista
+def referencia_totais_analista(df_analista):
+    total_geral_analista = len(df_analista[(df_analista['SITUAÇÃO DA TAREFA'] == 'Finalizada') | (df_analista['SITUAÇÃO DA TAREFA'] == 'Cancelada')])
+    total_finalizados_analista = len(df_analista[df_analista['SITUAÇÃO DA TAREFA'] == 'Finalizada'])
+    total_reclass_analista = len(df_analista[df_analista['SITUAÇÃO DA TAREFA'] == 'Cancelada'])
+    # Calcula o TMO, quantidade de finalizados e reclassificações apenas para o analista especifico
+    total_finalizados = len(df_analista[df_analista['SITUAÇÃO DA TAREFA'] == 'Finalizada'])
+    total_reclass = len(df_analista[df_analista['SITUAÇÃO DA TAREFA'] == 'Cancelada'])
+    # Verifique se o denominador não é zero
+    if (total_finalizados + total_reclass) > 0:
+        # Se houver cadastros finalizados ou reclassificados, calcula o tempo médio
+        tempo_medio_analista = (df_analista[df_analista['SITUAÇÃO DA TAREFA'] == 'Finalizada']['TEMPO MÉDIO OPERACIONAL'].sum() + 
+                    df_analista[df_analista['SITUAÇÃO DA TAREFA'] == 'Cancelada']['TEMPO MÉDIO OPERACIONAL'].sum()) / (total_finalizados + total_reclass)
+    else:
+        # Se não houver cadastros finalizados ou reclassificados, define o tempo médio como zero ou outro valor padrão
+        tempo_medio_analista = pd.Timedelta(0)  # ou "0 min"
+    return {
+        'total_geral': total_geral_analista,
+        'total_finalizados': total_finalizados_analista,
+        'total_reclass': total_reclass_analista,
+        'tempo_medio': tempo_medio_analista
+    }
+
+# Trecho das Métricas Individuais em dashboard(): TMO da equipe
+def referencia_tmo_equipe(df_total):
+    tmo_equipe = df_total[df_total['SITUAÇÃO DA TAREFA'] == 'Finalizada']['TEMPO MÉDIO OPERACIONAL'].mean()
+    return tmo_equipe
+
+# Trecho das Métricas Individuais em dashboard(): tabela de filas do analista (sem o Styler)
+def referencia_filas_analista(df_analista):
+    # Filtrar apenas as tarefas finalizadas para cálculo do TMO
+    filas_finalizadas_analista = df_analista[df_analista['SITUAÇÃO DA TAREFA'] == 'Finalizada']
+    
+    # Agrupa por 'FILA' e calcula a quantidade e o TMO médio para cada fila
+    carteiras_analista = filas_finalizadas_analista.groupby('FILA').agg(
+        Quantidade=('FILA', 'size'),
+        TMO_médio=('TEMPO MÉDIO OPERACIONAL', 'mean')
+    ).reset_index()
+
+    # Converte o TMO médio para minutos e segundos
+    carteiras_analista['TMO_médio'] = carteiras_analista['TMO_médio'].apply(referencia_format_timedelta)
+
+    # Renomeia as colunas
+    carteiras_analista = carteiras_analista.rename(columns={'FILA': 'Fila', 'Quantidade': 'Quantidade', 'TMO_médio': 'TMO Médio por Fila'})
+    return carteiras_analista
+
+# Trecho das Métricas Individuais em dashboard(): tabela de protocolos do analista (sem o Styler; None quando a tabela não era exibida)
+def referencia_protocolos_analista(df_analista):
+    # Verificar se o DataFrame possui as colunas necessárias
+    if not df_analista.empty and 'NÚMERO DO PROTOCOLO' in df_analista.columns and 'FILA' in df_analista.columns:
+        # Filtrar apenas as tarefas finalizadas para cálculo do TMO
+        filas_finalizadas_analista = df_analista[df_analista['SITUAÇÃO DA TAREFA'] == 'Finalizada']
+        
+        # Contar a quantidade de pastas preenchidas para cada protocolo
+        pasta_columns = [col for col in filas_finalizadas_analista.columns if col.startswith('PASTA')]
+        filas_finalizadas_analista['Quantidade de Pastas'] = filas_finalizadas_analista[pasta_columns].notna().sum(axis=1)
+
+        # Verificar a quantidade de requisições
+        filas_finalizadas_analista['Número de Requisições'] = filas_finalizadas_analista['NÚMERO REQUISIÇÃO'].notna().astype(int)
+        
+        filas_finalizadas_analista['ID Projuris'] = filas_finalizadas_analista['ID PROJURIS'].notna().astype(int)
+
+        # Agrupar os dados por 'NÚMERO DO PROTOCOLO' e 'FILA'
+        protocolos_analista = filas_finalizadas_analista.groupby(['NÚMERO DO PROTOCOLO', 'FILA']).agg(
+            Quantidade_de_Pastas=('Quantidade de Pastas', 'first'),
+            Número_de_Requisições=('Número de Requisições', 'first'),
+            ID_Projuris=('ID Projuris', 'first'),
+            TMO_médio=('TEMPO MÉDIO OPERACIONAL', 'mean')
+        ).reset_index()
+
+        # Ajustar a quantidade de pastas para exibir 0 caso não haja pastas
+        protocolos_analista['Quantidade_de_Pastas'] = protocolos_analista['Quantidade_de_Pastas'].fillna(0)
+
+        # Converter o TMO médio para minutos e segundos
+        protocolos_analista['TMO_médio'] = protocolos_analista['TMO_médio'].apply(referencia_format_timedelta)
+
+        # Renomear as colunas para exibição
+        protocolos_analista = protocolos_analista.rename(columns={
+            'NÚMERO DO PROTOCOLO': 'Número do Protocolo',
+            'FILA': 'Fila',
+            'Quantidade_de_Pastas': 'Quantidade de Pastas',
+            'Número_de_Requisições': 'Número de Requisições',
+            'ID_Projuris': 'ID Projuris',
+            'TMO_médio': 'Tempo de Análise por Protocolo'
+        })
+        return protocolos_analista
+    return None
+
+# Trecho das Métricas Individuais em dashboard(): série do gráfico de tempo médio do analista por dia
+def referencia_tmo_por_dia_analista(df_analista):
+    df_tmo_analista = referencia_calcular_tmo_por_dia(df_analista)
+    return df_tmo_analista
+
+# Referência das janelas móveis (não existiam na c94bd65): agregação diária em pandas no calendário completo e rolling
+def referencia_janelas_equipe(df):
+    df['Dia'] = pd.to_datetime(df['DATA DE CONCLUSÃO DA TAREFA']).dt.date
+    df_finalizados = df[df['SITUAÇÃO DA TAREFA'].isin(['Finalizada', 'Cancelada'])]
+    df_tmo = df_finalizados.groupby('Dia').agg(
+        Tempo_Total=('TEMPO MÉDIO OPERACIONAL', 'sum'),
+        Total_Finalizados_Cancelados=('SITUAÇÃO DA TAREFA', 'count')
+    )
+    if df_tmo.empty:
+        return pd.DataFrame(columns=['Quantidade_7', 'Tempo_Total_7', 'Quantidade_30', 'Tempo_Total_30'], dtype=float)
+    serie = df_tmo.set_index(pd.to_datetime(df_tmo.index))
+    serie = serie.reindex(pd.date_range(serie.index.min(), serie.index.max(), freq='D'))
+    quantidade = serie['Total_Finalizados_Cancelados'].fillna(0).astype(float)
+    tempo = serie['Tempo_Total'].dt.total_seconds().fillna(0)
+    return pd.DataFrame({
+        'Quantidade_7': quantidade.rolling(7, min_periods=1).sum().to_numpy(),
+        'Tempo_Total_7': tempo.rolling(7, min_periods=1).sum().to_numpy(),
+        'Quantidade_30': quantidade.rolling(30, min_periods=1).sum().to_numpy(),
+        'Tempo_Total_30': tempo.rolling(30, min_periods=1).sum().to_numpy()
+    })
+
+# Implementações atuais levadas ao que a c94bd65 exibia: durações formatadas com format_timedelta
+# (hoje a formatação fica nas tabelas e gráficos) e só as colunas que a versão antiga devolvia
+def formatar_duracao(df, coluna):
+    df[coluna] = df[coluna].apply(metricas.format_timedelta)
+    return df
+
+def atual_visao_geral(df):
+    agregados = dict(metricas.calcular_visao_geral(df))
+    agregados['df_tmo'] = agregados['df_tmo'][['Dia', 'TMO', 'TMO_Formatado']]
+    return agregados
+
+def atual_tmo_por_dia_geral(df):
+    return metricas.calcular_tmo_por_dia_geral(df)[['Dia', 'TMO', 'TMO_Formatado']]
+
+def atual_filas_analista(df_analista):
+    return formatar_duracao(metricas.calcular_filas_analista(df_analista), 'TMO Médio por Fila')
+
+# Mesma condição usada pela dashboard para exibir a tabela
+def atual_protocolos_analista(df_analista):
+    if not df_analista.empty and 'NÚMERO DO PROTOCOLO' in df_analista.columns and 'FILA' in df_analista.columns:
+        return formatar_duracao(metricas.calcular_protocolos_analista(df_analista), 'Tempo de Análise por Protocolo')
+    return None
+
+# O gráfico do analista usa calcular_tmo_por_dia_geral e exibe TMO_Formatado
+def atual_tmo_por_dia_analista(df_analista):
+    return metricas.calcular_tmo_por_dia_geral(df_analista)[['Dia', 'TMO_Formatado']].rename(columns={'TMO_Formatado': 'TMO'})
+
+def janelas_equipe(df):
+    serie = calcular_janelas(df)['equipe']
+    return serie[['Quantidade_7', 'Tempo_Total_7', 'Quantidade_30', 'Tempo_Total_30']].reset_index(drop=True)
+
+# Comparações: nome -> (referência, implementação atual, nível, exata)
+# Nível 'equipe' recebe o DataFrame inteiro; 'analista' roda para cada analista (e um analista sem tarefas).
+# As janelas somam segundos em ponto flutuante em outra ordem, então são comparadas com tolerância
+COMPARACOES = {
+    'format_timedelta': (lambda df: df['TEMPO MÉDIO OPERACIONAL'].apply(referencia_format_timedelta), lambda df: df['TEMPO MÉDIO OPERACIONAL'].apply(metricas.format_timedelta), 'equipe', True),
+    'calcular_tmo_por_dia': (referencia_calcular_tmo_por_dia, metricas.calcular_tmo_por_dia, 'equipe', True),
+    'calcular_tmo_por_dia_geral': (referencia_calcular_tmo_por_dia_geral, atual_tmo_por_dia_geral, 'equipe', True),
+    'calcular_produtividade_diaria': (referencia_calcular_produtividade_diaria, metricas.calcular_produtividade_diaria, 'equipe', True),
+    'calcular_tmo_por_analista': (referencia_calcular_tmo_por_analista, metricas.calcular_tmo_por_analista, 'equipe', True),
+    'calcular_visao_geral': (referencia_visao_geral, atual_visao_geral, 'equipe', True),
+    'calcular_tmo_equipe': (referencia_tmo_equipe, metricas.calcular_tmo_equipe, 'equipe', True),
+    'calcular_totais_analista': (referencia_totais_analista, metricas.calcular_totais_analista, 'analista', True),
+    'calcular_filas_analista': (referencia_filas_analista, atual_filas_analista, 'analista', True),
+    'calcular_protocolos_analista': (referencia_protocolos_analista, atual_protocolos_analista, 'analista', True),
+    'tmo_por_dia_analista': (referencia_tmo_por_dia_analista, atual_tmo_por_dia_analista, 'analista', True),
+    'janelas_moveis_equipe': (referencia_janelas_equipe, janelas_equipe, 'equipe', False)
+}
+
+# Função para converter a planilha no formato exportado da mesma forma que a dashboard
+def converter(df):
+    return convert_to_datetime_for_calculations(convert_to_timedelta_for_calculations(df.copy()))
+
+# Função para gerar a base dos testes: planilha sintética com outras situações e colunas de pastas
+def gerar_base(linhas, semente):
+    rng = np.random.default_rng(semente)
+    df = gerar_planilha(linhas, 120, semente)
+    df['SITUAÇÃO DA TAREFA'] = np.where(rng.random(linhas) < 0.1, 'Em Andamento', df['SITUAÇÃO DA TAREFA'])
+    df['PASTA 1'] = np.where(rng.random(linhas) < 0.6, 'pasta', None)
+    df['PASTA 2'] = np.where(rng.random(linhas) < 0.2, 'pasta', None)
+    return df
+
+# Função para montar os casos limite a partir de uma base pequena
+def casos_limite(base):
+    casos = {'vazio': base.iloc[:0], 'uma_linha': base.iloc[:1]}
+
+    df = base.copy()
+    df.loc[::7, 'DATA DE CONCLUSÃO DA TAREFA'] = 'data inválida'
+    casos['datas_nat'] = df
+
+    df = base.copy()
+    df.loc[::5, 'TEMPO MÉDIO OPERACIONAL'] = 'xx'
+    df.loc[1::11, 'TEMPO MÉDIO OPERACIONAL'] = None
+    casos['duracoes_invalidas'] = df
+
+    # Células de duração formatadas como hh:mm:ss no Excel chegam do read_excel como datetime.time
+    df = base.copy().astype({'TEMPO MÉDIO OPERACIONAL': object})
+    tempos = pd.to_timedelta(df['TEMPO MÉDIO OPERACIONAL'])
+    celulas_excel = tempos < pd.Timedelta(days=1)
+    df.loc[celulas_excel, 'TEMPO MÉDIO OPERACIONAL'] = [(datetime.min + tempo.to_pytimedelta()).time() for tempo in tempos[celulas_excel]]
+    casos['duracoes_excel'] = df
+
+    df = base.copy()
+    dias = df['DATA DE CONCLUSÃO DA TAREFA'].str[:10].drop_duplicates().iloc[:5]
+    df.loc[df['DATA DE CONCLUSÃO DA TAREFA'].str[:10].isin(dias), 'SITUAÇÃO DA TAREFA'] = 'Cancelada'
+    casos['dias_so_canceladas'] = df
+
+    df = base.copy()
+    df.loc[df.index[:len(df) // 2], 'SITUAÇÃO DA TAREFA'] = 'Em Andamento'
+    casos['muitas_em_andamento'] = df
+
+    duplicados = base.sample(len(base) // 4, random_state=0)
+    casos['protocolos_duplicados'] = pd.concat([base, duplicados, duplicados.assign(FILA='Outra Fila')], ignore_index=True)
+    return {nome: converter(df) for nome, df in casos.items()}
+
+# Função para executar uma implementação numa cópia (algumas acrescentam colunas ao DataFrame recebido)
+# Uma exceção também é um resultado: as duas implementações precisam falhar com o mesmo tipo e a mesma mensagem
+def executar(funcao, df):
+    try:
+        return funcao(df.copy())
+    except Exception as erro:
+        return erro
+
+# Função para comparar dois resultados; devolve None quando iguais ou a descrição da primeira diferença
+def diferenca(esperado, obtido, exata):
+    if isinstance(esperado, Exception) or isinstance(obtido, Exception):
+        if type(esperado) is type(obtido) and str(esperado) == str(obtido):
+            return None
+        return f"referência: {esperado!r}, atual: {obtido!r}"
+    if isinstance(esperado, dict):
+        if set(esperado) != set(obtido):
+            return f"chaves diferentes: {sorted(esperado)} x {sorted(obtido)}"
+        for chave in esperado:
+            motivo = diferenca(esperado[chave], obtido[chave], exata)
+            if motivo:
+                return f"{chave}: {motivo}"
+        return None
+    try:
+        if isinstance(esperado, pd.DataFrame):
+            pd.testing.assert_frame_equal(obtido, esperado, check_exact=exata, rtol=1e-9, atol=1e-6)
+        elif isinstance(esperado, pd.Series):
+            pd.testing.assert_series_equal(obtido, esperado, check_exact=exata, rtol=1e-9, atol=1e-6)
+        elif not (pd.isna(esperado) and pd.isna(obtido)) and not (type(esperado) is type(obtido) and esperado == obtido):
+            return f"referência: {esperado!r}, atual: {obtido!r}"
+    except AssertionError as erro:
+        return str(erro).strip().replace('\n', ' ')
+    return None
+
+# Função para listar os DataFrames de entrada de uma comparação (o período inteiro ou cada analista)
+def entradas(df, nivel):
+    if nivel == 'equipe':
+        return [df]
+    analistas = sorted(df['USUÁRIO QUE CONCLUIU A TAREFA'].dropna().unique()) + ['Analista sem tarefas']
+    return [df[df['USUÁRIO QUE CONCLUIU A TAREFA'] == analista].copy() for analista in analistas]
+
+# Função para medir o melhor tempo (ms) de uma implementação sobre todas as entradas
+def medir(funcao, dfs, repeticoes):
+    melhor = None
+    for _ in range(repeticoes):
+        copias = [df.copy() for df in dfs]
+        inicio = time.perf_counter()
+        for copia in copias:
+            funcao(copia)
+        duracao = (time.perf_counter() - inicio) * 1000
+        melhor = duracao if melhor is None else min(melhor, duracao)
+    return melhor
+
+# Função para executar todas as comparações; devolve as falhas encontradas
+def verificar(linhas, repeticoes, semente):
+    casos = casos_limite(gerar_base(400, semente))
+    casos['gerado'] = converter(gerar_base(linhas, semente + 1))
+
+    falhas = []
+    print(f"{'comparação':<32} {'casos':>6} {'referência (ms)':>16} {'atual (ms)':>11} {'ganho':>7}")
+    for nome, (referencia, atual, nivel, exata) in COMPARACOES.items():
+        for caso, df in casos.items():
+            for df_entrada in entradas(df, nivel):
+                motivo = diferenca(executar(referencia, df_entrada), executar(atual, df_entrada), exata)
+                if motivo:
+                    falhas.append(f"{nome} [{caso}]: {motivo[:300]}")
+                    break
+
+        dfs = entradas(casos['gerado'], nivel)
+        tempo_referencia = medir(referencia, dfs, repeticoes)
+        tempo_atual = medir(atual, dfs, repeticoes)
+        print(f"{nome:<32} {len(casos):>6} {tempo_referencia:>16.1f} {tempo_atual:>11.1f} {tempo_referencia / tempo_atual:>6.2f}x")
+    return falhas
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compara as métricas atuais com as implementações de referência em pandas")
+    parser.add_argument('--linhas', type=int, default=50000, help="linhas do conjunto gerado usado também para medir o tempo")
+    parser.add_argument('--repeticoes', type=int, default=3, help="repetições de cada medição (vale o melhor tempo)")
+    parser.add_argument('--semente', type=int, default=0, help="semente dos dados gerados")
+    args = parser.parse_args()
+
+    falhas = verificar(args.linhas, args.repeticoes, args.semente)
+    for falha in falhas:
+        print(f"DIFERENÇA: {falha}")
+    print("Resultados idênticos à referência." if not falhas else f"{len(falhas)} comparações com diferenças.")
+    sys.exit(1 if falhas else 0)
@@ -0,0 +1,42 @@
+import numpy as np
+import pandas as pd
+
+# Esboço de quantis com baldes logarítmicos (mesma ideia do DDSketch): cada duração cai no balde
+# ceil(log(segundos) / log(GAMA)) e o valor devolvido para um balde tem erro relativo máximo de PRECISAO.
+# Como o esboço é só uma contagem por balde, juntar períodos, analistas ou filas é somar as contagens.
+PRECISAO = 0.01
+GAMA = (1 + PRECISAO) / (1 - PRECISAO)
+LOG_GAMA = np.log(GAMA)
+
+# Durações abaixo de 1 segundo são tratadas como 1 segundo
+SEGUNDOS_MINIMOS = 1.0
+
+# Função para converter durações em segundos para o índice do balde
+def calcular_baldes(segundos):
+    segundos = np.clip(np.asarray(segundos, dtype=float), SEGUNDOS_MINIMOS, None)
+    return np.ceil(np.log(segundos) / LOG_GAMA).astype(np.int32)
+
+# Função para obter o valor representativo (em segundos) de cada balde
+def valor_balde(baldes):
+    return 2 * np.power(GAMA, np.asarray(baldes, dtype=float)) / (GAMA + 1)
+
+# Função para somar as contagens de vários esboços (DataFrame com as colunas Balde e Contagem)
+def mesclar_esbocos(df_esbocos):
+    return df_esbocos.groupby('Balde', sort=True)['Contagem'].sum()
+
+# Função para calcular os quantis (em segundos) a partir das contagens por balde
+def quantis_do_esboco(contagens, quantis=(0.5, 0.9, 0.99)):
+    if contagens.empty or contagens.sum() == 0:
+        return {q: None for q in quantis}
+    contagens = contagens.sort_index()
+    acumulado = contagens.cumsum().to_numpy()
+    total = acumulado[-1]
+    resultado = {}
+    for q in quantis:
+        posicao = np.searchsorted(acumulado, q * (total - 1), side='right')
+        resultado[q] = float(valor_balde(contagens.index[posicao]))
+    return resultado
+
+# Função para converter os quantis em segundos para timedelta
+def quantis_timedelta(quantis):
+    return {q: (pd.Timedelta(seconds=valor) if valor is not None else None) for q, valor in quantis.items()}
@@ -0,0 +1,85 @@
+import os
+import tempfile
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from openpyxl import Workbook
+
+# Exportação das tabelas filtradas da dashboard. As linhas são escritas em lotes num arquivo temporário
+# (CSV, Parquet ou XLSX em modo write-only), sem montar uma cópia formatada da tabela inteira na memória.
+
+TAMANHO_LOTE = 10000
+
+# Formato -> (extensão, tipo MIME)
+FORMATOS = {
+    'CSV': ('csv', 'text/csv'),
+    'Parquet': ('parquet', 'application/vnd.apache.parquet'),
+    'XLSX': ('xlsx', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
+}
+
+# Função para percorrer a tabela em lotes (sempre ao menos um, para o cabeçalho de tabelas vazias)
+# O índice nomeado (ex.: 'Posição' do ranking) vira coluna
+def lotes(df, tamanho=TAMANHO_LOTE):
+    for inicio in range(0, max(len(df), 1), tamanho):
+        lote = df.iloc[inicio:inicio + tamanho]
+        yield lote.reset_index() if df.index.name is not None else lote
+
+# Função para converter as durações (CSV e XLSX) ou as colunas de tipos misturados (Parquet) de um lote em texto
+# Valores vazios continuam vazios
+def preparar_lote(lote, duracoes=True, textos=False):
+    lote = lote.copy()
+    for coluna in lote.columns:
+        if (duracoes and pd.api.types.is_timedelta64_dtype(lote[coluna])) or (textos and lote[coluna].dtype == object):
+            lote[coluna] = lote[coluna].astype(str).where(lote[coluna].notna(), None)
+    return lote
+
+# Função para montar o esquema do Parquet pelos tipos das colunas, igual para todos os lotes
+def esquema_parquet(df):
+    if df.index.name is not None:
+        df = df.iloc[:0].reset_index()
+    campos = []
+    for coluna, tipo in df.dtypes.items():
+        if pd.api.types.is_object_dtype(tipo) or pd.api.types.is_string_dtype(tipo):
+            campos.append(pa.field(str(coluna), pa.string()))
+        else:
+            campos.append(pa.field(str(coluna), pa.from_numpy_dtype(tipo)))
+    return pa.schema(campos)
+
+# Funções de escrita de cada formato
+def escrever_csv(df, caminho):
+    with open(caminho, 'w', encoding='utf-8-sig', newline='') as file:
+        for numero, lote in enumerate(lotes(df)):
+            preparar_lote(lote).to_csv(file, sep=';', index=False, header=numero == 0)
+
+def escrever_parquet(df, caminho):
+    esquema = esquema_parquet(df)
+    with pq.ParquetWriter(caminho, esquema, compression='zstd') as writer:
+        for lote in lotes(df):
+            lote = preparar_lote(lote.rename(columns=str), duracoes=False, textos=True)
+            writer.write_table(pa.Table.from_pandas(lote, schema=esquema, preserve_index=False))
+
+def escrever_xlsx(df, caminho):
+    workbook = Workbook(write_only=True)
+    planilha = workbook.create_sheet()
+    for numero, lote in enumerate(lotes(df)):
+        if numero == 0:
+            planilha.append([str(coluna) for coluna in lote.columns])
+        for linha in preparar_lote(lote).itertuples(index=False, name=None):
+            planilha.append([None if pd.isna(valor) else valor for valor in linha])
+    workbook.save(caminho)
+
+ESCRITORES = {'CSV': escrever_csv, 'Parquet': escrever_parquet, 'XLSX': escrever_xlsx}
+
+# Função para exportar a tabela para um arquivo temporário e devolver o conteúdo para o botão de download
+# Limitação: o st.download_button não aceita geradores e lê arquivos abertos por inteiro para o seu armazenamento
+# de mídia, então o arquivo final fica na memória de qualquer forma; só a escrita é feita em lotes
+def exportar(df, formato):
+    extensao, _ = FORMATOS[formato]
+    descritor, caminho = tempfile.mkstemp(suffix=f'.{extensao}')
+    os.close(descritor)
+    try:
+        ESCRITORES[formato](df, caminho)
+        with open(caminho, 'rb') as file:
+            return file.read()
+    finally:
+        os.remove(caminho)
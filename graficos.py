@@ -0,0 +1,249 @@
+import pandas as pd
+import plotly.express as px
+from metricas import format_timedelta
+from janelas import JANELAS
+
+# Acima desta quantidade de pontos o gráfico usa traços WebGL em vez de SVG
+LIMITE_PONTOS_SVG = 200
+
+# Períodos maiores que estes (em dias) são agrupados por semana ou por mês
+LIMITE_DIAS_DIARIO = 366
+LIMITE_DIAS_SEMANAL = 3 * 366
+
+# Função para escolher o agrupamento da série de acordo com o período coberto
+def escolher_granularidade(dias):
+    if dias.empty:
+        return 'D'
+    periodo = (pd.Timestamp(dias.max()) - pd.Timestamp(dias.min())).days
+    if periodo > LIMITE_DIAS_SEMANAL:
+        return 'M'
+    if periodo > LIMITE_DIAS_DIARIO:
+        return 'W'
+    return 'D'
+
+# Função para reagrupar uma série diária por semana ou mês somando as colunas informadas
+def reamostrar(df, colunas_soma, granularidade):
+    df = df.copy()
+    df['Dia'] = pd.to_datetime(df['Dia'])
+    if granularidade == 'D':
+        return df
+    df['Dia'] = df['Dia'].dt.to_period(granularidade).dt.start_time
+    return df.groupby('Dia', as_index=False)[colunas_soma].sum()
+
+# Função para reagrupar a série de TMO, recalculando a média ponderada pela quantidade de tarefas
+def reamostrar_tmo(df_tmo, granularidade):
+    df_tmo = reamostrar(df_tmo, ['Tempo_Total', 'Total_Finalizados_Cancelados'], granularidade)
+    if granularidade != 'D':
+        df_tmo['TMO'] = (df_tmo['Tempo_Total'] / df_tmo['Total_Finalizados_Cancelados']).fillna(pd.Timedelta(seconds=0))
+        df_tmo['TMO_Formatado'] = df_tmo['TMO'].apply(format_timedelta)
+    df_tmo['TMO_minutos'] = df_tmo['TMO'].dt.total_seconds().fillna(0) / 60
+    return df_tmo
+
+# Função para montar o formato da data no hover e o título de acordo com o agrupamento
+def rotulo_granularidade(granularidade):
+    if granularidade == 'M':
+        return '%m/%Y', 'Valores agrupados por mês'
+    if granularidade == 'W':
+        return 'semana de %d/%m/%Y', 'Valores agrupados por semana'
+    return '%d/%m/%Y', None
+
+# Função para indicar no título quando a série foi agrupada
+def adicionar_titulo(fig, titulo):
+    if titulo:
+        fig.update_layout(title=dict(text=titulo, font=dict(size=12)))
+    return fig
+
+# Gráfico de linhas de produtividade diária
+def grafico_produtividade(df_produtividade, cores):
+    granularidade = escolher_granularidade(df_produtividade['Dia'])
+    df = reamostrar(df_produtividade, ['Finalizado', 'Cancelada', 'Produtividade'], granularidade)
+    formato_data, titulo = rotulo_granularidade(granularidade)
+    fig = px.line(
+        df,
+        x='Dia',
+        y='Produtividade',
+        color_discrete_sequence=cores,
+        labels={'Produtividade': 'Total de Cadastros'},
+        line_shape='linear',
+        markers=len(df) <= LIMITE_PONTOS_SVG,
+        render_mode='webgl' if len(df) > LIMITE_PONTOS_SVG else 'svg'
+    )
+    fig.update_traces(
+        hovertemplate=f'Dia = %{{x|{formato_data}}}<br>Produtividade = %{{y}}'
+    )
+    return adicionar_titulo(fig, titulo)
+
+# Gráfico de linhas do TMO diário da equipe
+def grafico_tmo_equipe(df_tmo, cores):
+    granularidade = escolher_granularidade(df_tmo['Dia'])
+    df = reamostrar_tmo(df_tmo, granularidade)
+    formato_data, titulo = rotulo_granularidade(granularidade)
+    fig = px.line(
+        df,
+        x='Dia',
+        y='TMO_minutos',
+        labels={'TMO_minutos': 'Tempo Médio Operacional (min)', 'Dia': 'Data'},
+        line_shape='linear',
+        markers=len(df) <= LIMITE_PONTOS_SVG,
+        render_mode='webgl' if len(df) > LIMITE_PONTOS_SVG else 'svg',
+        color_discrete_sequence=cores
+    )
+    # O texto formatado vai no customdata para aparecer só no hover, sem rótulo em cada ponto
+    fig.update_traces(
+        hovertemplate=f'Data = %{{x|{formato_data}}}<br>TMO = %{{customdata}}',
+        customdata=df['TMO_Formatado']
+    )
+    return adicionar_titulo(fig, titulo)
+
+# Gráfico de barras do TMO diário de um analista
+def grafico_tmo_analista_por_dia(df_tmo, cores):
+    granularidade = escolher_granularidade(df_tmo['Dia'])
+    df = reamostrar_tmo(df_tmo, granularidade)
+    formato_data, titulo = rotulo_granularidade(granularidade)
+    fig = px.bar(
+        df, x='Dia',
+        y='TMO_minutos',
+        labels={'TMO_minutos': 'TMO (min)', 'Dia': 'Dia'},
+        color_discrete_sequence=cores
+    )
+    # Com muitas barras o texto dentro delas fica ilegível e só aumenta o tamanho do gráfico
+    fig.update_traces(
+        hovertemplate=f'Data = %{{x|{formato_data}}}<br>TMO = %{{customdata}}',
+        customdata=df['TMO_Formatado'],
+        text=df['TMO_Formatado'] if len(df) <= LIMITE_PONTOS_SVG else None,
+        textfont_color='white'  # Define a cor do texto como branco
+    )
+    return adicionar_titulo(fig, titulo)
+
+# Gráfico de pizza com a legenda na horizontal abaixo (finalizações e filas)
+def grafico_pizza(nomes, valores, cores):
+    fig = px.pie(
+        names=nomes,
+        values=valores,
+        color_discrete_sequence=cores
+    )
+    fig.update_traces(
+        hovertemplate='Tarefas %{label} = %{value}<extra></extra>',
+    )
+    fig.update_layout(
+        legend=dict(
+            orientation="h",
+            yanchor="top",
+            y=-0.1,
+            xanchor="center",
+            x=0.5
+        )
+    )
+    return fig
+
+# Gráfico de barras do TMO por analista em minutos
+def grafico_tmo_por_analista(df_tmo_analista, cores):
+    fig = px.bar(
+        df_tmo_analista,
+        x='USUÁRIO QUE CONCLUIU A TAREFA',
+        y=df_tmo_analista['TMO'].dt.total_seconds() / 60,  # TMO em minutos
+        title='TMO por Analista (em minutos e segundos)',
+        labels={'y': 'TMO (min)', 'USUÁRIO QUE CONCLUIU A TAREFA': 'Analista'},
+        text=df_tmo_analista['TMO_Formatado'],
+        color_discrete_sequence=cores
+    )
+    fig.update_traces(
+        textposition='outside',  # Exibe o tempo formatado fora das barras
+        hovertemplate='Analista = %{x}<br>TMO = %{text}<extra></extra>',
+        text=df_tmo_analista['TMO_Formatado']
+    )
+    return fig
+
+# Função para colocar as janelas móveis em formato longo (uma linha do gráfico por janela)
+def janelas_em_linhas(df_moveis, prefixo, valor):
+    df = df_moveis.melt(id_vars='Dia', value_vars=[f'{prefixo}_{janela}' for janela in JANELAS], var_name='Janela', value_name=valor)
+    df['Janela'] = df['Janela'].str.replace(f'{prefixo}_', '') + ' dias'
+    return df
+
+# Gráfico de linhas da produtividade média por dia nas janelas móveis
+def grafico_produtividade_movel(df_moveis, cores):
+    df = janelas_em_linhas(df_moveis, 'Produtividade', 'Produtividade')
+    fig = px.line(
+        df,
+        x='Dia',
+        y='Produtividade',
+        color='Janela',
+        labels={'Produtividade': 'Cadastros por dia (média)'},
+        render_mode='webgl' if len(df_moveis) > LIMITE_PONTOS_SVG else 'svg',
+        color_discrete_sequence=cores
+    )
+    fig.update_traces(hovertemplate='Dia = %{x|%d/%m/%Y}<br>Produtividade = %{y:.1f}')
+    return fig
+
+# Gráfico de linhas do TMO nas janelas móveis
+def grafico_tmo_movel(df_moveis, cores):
+    df = janelas_em_linhas(df_moveis, 'TMO', 'TMO')
+    df['TMO_minutos'] = df['TMO'].dt.total_seconds() / 60
+    df['TMO_Formatado'] = df['TMO'].apply(format_timedelta)
+    fig = px.line(
+        df,
+        x='Dia',
+        y='TMO_minutos',
+        color='Janela',
+        custom_data=['TMO_Formatado'],
+        labels={'TMO_minutos': 'Tempo Médio Operacional (min)'},
+        render_mode='webgl' if len(df_moveis) > LIMITE_PONTOS_SVG else 'svg',
+        color_discrete_sequence=cores
+    )
+    fig.update_traces(hovertemplate='Dia = %{x|%d/%m/%Y}<br>TMO = %{customdata[0]}')
+    return fig
+
+DIAS_SEMANA = ['Segunda', 'Terça', 'Quarta', 'Quinta', 'Sexta', 'Sábado', 'Domingo']
+
+# Mapa de calor das conclusões por dia da semana e hora do dia
+def grafico_mapa_calor(matriz, cores):
+    fig = px.imshow(
+        matriz,
+        x=[f'{hora:02d}h' for hora in range(24)],
+        y=DIAS_SEMANA,
+        labels={'x': 'Hora', 'y': 'Dia da Semana', 'color': 'Tarefas'},
+        color_continuous_scale=[cores[5], cores[1], cores[0], cores[3]],
+        aspect='auto'
+    )
+    fig.update_traces(
+        hovertemplate='%{y} às %{x}<br>Tarefas = %{z}<extra></extra>'
+    )
+    return fig
+
+# Gráfico de barras da produtividade de cada equipe
+def grafico_produtividade_equipes(df_equipes, cores):
+    fig = px.bar(
+        df_equipes, x='Equipe', y='Produtividade',
+        labels={'Produtividade': 'Total de Cadastros'},
+        text='Produtividade',
+        color_discrete_sequence=cores
+    )
+    fig.update_traces(hovertemplate='Equipe = %{x}<br>Produtividade = %{y}<extra></extra>')
+    return fig
+
+# Gráfico de barras do TMO de cada equipe
+def grafico_tmo_equipes(df_equipes, cores):
+    df = df_equipes.assign(
+        TMO_minutos=df_equipes['TMO'].dt.total_seconds() / 60,
+        TMO_Formatado=df_equipes['TMO'].apply(format_timedelta)
+    )
+    fig = px.bar(
+        df, x='Equipe', y='TMO_minutos',
+        labels={'TMO_minutos': 'TMO (min)'},
+        text='TMO_Formatado',
+        color_discrete_sequence=cores
+    )
+    fig.update_traces(textposition='outside', hovertemplate='Equipe = %{x}<br>TMO = %{text}<extra></extra>')
+    return fig
+
+# Gráfico de barras empilhadas com a distribuição das finalizações de cada equipe
+def grafico_finalizacoes_equipes(df_equipes, finalizacoes, cores):
+    df = df_equipes.melt(id_vars='Equipe', value_vars=finalizacoes, var_name='Finalização', value_name='Tarefas')
+    fig = px.bar(
+        df, x='Equipe', y='Tarefas', color='Finalização',
+        barmode='stack',
+        color_discrete_sequence=cores
+    )
+    fig.update_traces(hovertemplate='Equipe = %{x}<br>Tarefas = %{y}<extra></extra>')
+    fig.update_layout(legend=dict(orientation="h", yanchor="top", y=-0.2, xanchor="center", x=0.5))
+    return fig
@@ -0,0 +1,135 @@
+import os
+import glob
+import json
+import hashlib
+import time
+from datetime import datetime
+import pandas as pd
+from dados import trava_usuario, convert_to_timedelta_for_calculations, convert_to_datetime_for_calculations
+from validacao import validar_planilha
+from rollups import atualizar_rollups
+from particoes import atualizar_particoes
+
+# Ingestão de planilhas usada pelo upload da dashboard e pelas pastas de entrada monitoradas.
+# Cada equipe tem uma pasta entrada_<usuario>; os arquivos .xlsx colocados nela são validados e
+# gravados em segundo plano, e depois movidos para as subpastas processados/ ou rejeitados/.
+
+SEGUNDOS_VERIFICACAO = 30
+PREFIXO_ENTRADA = 'entrada_'
+ARQUIVO_REGISTRO = 'ingestao.log'
+
+# Funções para ler e gravar as planilhas já ingeridas pelo usuário (assinatura das linhas -> nome e data)
+def arquivo_ingeridos(usuario):
+    return f'ingeridos_{usuario}.json'
+
+def ler_ingeridos(usuario):
+    try:
+        with open(arquivo_ingeridos(usuario), 'r', encoding='utf-8') as file:
+            return json.load(file)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+def registrar_ingerido(usuario, assinatura, nome):
+    ingeridos = ler_ingeridos(usuario)
+    ingeridos[assinatura] = {'arquivo': nome, 'data': datetime.now().isoformat(timespec='seconds')}
+    with open(arquivo_ingeridos(usuario), 'w', encoding='utf-8') as file:
+        json.dump(ingeridos, file, ensure_ascii=False)
+
+# Função para calcular a assinatura das linhas de uma planilha; a mesma exportação gerada de novo tem a mesma assinatura
+# mesmo que o arquivo mude (o .xlsx guarda a data de criação)
+def assinatura_linhas(df):
+    return hashlib.sha256(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes()).hexdigest()
+
+# Função para ingerir uma planilha: valida, ignora planilhas já carregadas e grava só as linhas novas nas partições
+# dos meses afetados e nos agregados, sem reescrever o histórico. Retorna as mensagens (tipo, texto) do resultado
+def ingerir_planilha(usuario, arquivo, nome):
+    # Valida o cabeçalho e uma amostra das linhas antes de ler a planilha inteira
+    validacao = validar_planilha(arquivo)
+    if not validacao['valido']:
+        mensagens = [('error', erro) for erro in validacao['erros']]
+        mensagens.append(('error', f'O arquivo "{nome}" não foi carregado.'))
+        return mensagens + [('warning', aviso) for aviso in validacao['avisos']]
+
+    df_new = pd.read_excel(arquivo).rename(columns=validacao['renomear'])
+    assinatura = assinatura_linhas(df_new)
+
+    # A trava do usuário é a mesma das leituras da dashboard: nenhuma sessão lê a planilha ou as partições durante a gravação
+    with trava_usuario(usuario):
+        if assinatura in ler_ingeridos(usuario):
+            return [('warning', f'O arquivo "{nome}" já foi carregado anteriormente e foi ignorado.')]
+
+        # As partições são gravadas primeiro; se os agregados não forem atualizados eles são recalculados a partir delas
+        df_new = convert_to_datetime_for_calculations(convert_to_timedelta_for_calculations(df_new))
+        versao_anterior, versao_nova = atualizar_particoes(usuario, df_new)
+        atualizar_rollups(usuario, versao_anterior, versao_nova, df_new)
+        registrar_ingerido(usuario, assinatura, nome)
+
+    mensagens = [('success', f'Arquivo "{nome}" carregado e processado com sucesso!')]
+    return mensagens + [('warning', aviso) for aviso in validacao['avisos']]
+
+# Função para acrescentar mensagens ao registro de uma pasta de entrada
+def registrar_mensagens(pasta, mensagens, agora=None):
+    agora = agora or datetime.now()
+    with open(os.path.join(pasta, ARQUIVO_REGISTRO), 'a', encoding='utf-8') as file:
+        for tipo, mensagem in mensagens:
+            file.write(f'{agora:%d/%m/%Y %H:%M:%S} [{tipo}] {mensagem}\n')
+
+# Função para ingerir um arquivo da pasta de entrada, movê-lo conforme o resultado e registrar as mensagens
+# Uma falha inesperada ao processar o arquivo também o rejeita, para que ele não seja tentado de novo a cada verificação
+def ingerir_arquivo_da_pasta(usuario, caminho):
+    nome = os.path.basename(caminho)
+    try:
+        with open(caminho, 'rb') as file:
+            mensagens = ingerir_planilha(usuario, file, nome)
+    except Exception as erro:
+        mensagens = [('error', f'Erro ao processar o arquivo "{nome}": {type(erro).__name__}: {erro}')]
+
+    destino = os.path.join(os.path.dirname(caminho), 'rejeitados' if any(tipo == 'error' for tipo, _ in mensagens) else 'processados')
+    os.makedirs(destino, exist_ok=True)
+    agora = datetime.now()
+    os.replace(caminho, os.path.join(destino, f'{agora:%Y%m%d%H%M%S}_{nome}'))
+    registrar_mensagens(os.path.dirname(caminho), mensagens, agora)
+    return mensagens
+
+# Função para verificar as pastas de entrada uma vez
+# Um arquivo só é ingerido quando data de modificação e tamanho não mudaram desde a verificação anterior (cópia concluída)
+# Os erros são tratados arquivo a arquivo: um arquivo com problema não impede a verificação dos demais nem das outras equipes
+def verificar_pastas(vistos):
+    encontrados = set()
+    for pasta in sorted(glob.glob(f'{PREFIXO_ENTRADA}*')):
+        if not os.path.isdir(pasta):
+            continue
+        usuario = pasta[len(PREFIXO_ENTRADA):]
+        for caminho in sorted(glob.glob(os.path.join(pasta, '*.xlsx'))):
+            if os.path.basename(caminho).startswith('~$'):
+                continue  # Arquivo temporário do Excel aberto
+            try:
+                info = os.stat(caminho)
+            except OSError:
+                continue  # Arquivo removido durante a verificação
+            encontrados.add(caminho)
+            if vistos.get(caminho) != (info.st_mtime_ns, info.st_size):
+                vistos[caminho] = (info.st_mtime_ns, info.st_size)
+                continue
+            try:
+                ingerir_arquivo_da_pasta(usuario, caminho)
+            except OSError as erro:
+                # O arquivo não pôde ser movido (por exemplo, aberto em outro programa): registra e tenta na próxima verificação
+                registrar_mensagens(pasta, [('error', f'Não foi possível mover o arquivo "{os.path.basename(caminho)}": {erro}')])
+                continue
+            encontrados.discard(caminho)
+
+    # Esquece os arquivos que saíram da pasta
+    for caminho in set(vistos) - encontrados:
+        del vistos[caminho]
+
+# Laço executado em segundo plano verificando as pastas de entrada a cada SEGUNDOS_VERIFICACAO
+def vigiar_pastas():
+    vistos = {}
+    while True:
+        try:
+            verificar_pastas(vistos)
+        except Exception as erro:
+            # Falha fora de um arquivo (ex.: ao listar as pastas): registra na pasta da dashboard e a thread continua
+            registrar_mensagens('.', [('error', f'Erro ao verificar as pastas de entrada: {type(erro).__name__}: {erro}')])
+        time.sleep(SEGUNDOS_VERIFICACAO)
@@ -0,0 +1,102 @@
+import numpy as np
+import pandas as pd
+
+# Janelas móveis de 7 e 30 dias de produtividade e TMO, da equipe e de cada analista.
+# Cada série guarda os totais de cada dia do calendário e as somas das janelas que terminam naquele dia.
+# Uma carga nova soma os totais nos dias alterados e recalcula só as janelas que contêm esses dias
+# (somas acumuladas sobre os dias alterados mais a maior janela), sem percorrer o histórico inteiro.
+
+JANELAS = (7, 30)
+MAIOR_JANELA = max(JANELAS)
+COLUNAS_TOTAIS = ['Quantidade', 'Tempo_Total']
+
+# Função para criar uma série sem dias
+def serie_vazia():
+    colunas = COLUNAS_TOTAIS + [f'{coluna}_{janela}' for janela in JANELAS for coluna in COLUNAS_TOTAIS]
+    return pd.DataFrame(columns=colunas, index=pd.DatetimeIndex([], name='Dia'), dtype=float)
+
+# Função para recalcular as somas das janelas que terminam nas posições de `inicio` a `fim` da série
+def recalcular_trecho(serie, inicio, fim):
+    base = max(0, inicio - MAIOR_JANELA + 1)
+    posicoes = np.arange(inicio, fim + 1) - base + 1
+    for coluna in COLUNAS_TOTAIS:
+        acumulado = np.concatenate([[0.0], np.cumsum(serie[coluna].to_numpy()[base:fim + 1])])
+        for janela in JANELAS:
+            somas = acumulado[posicoes] - acumulado[np.maximum(posicoes - janela, 0)]
+            serie.iloc[inicio:fim + 1, serie.columns.get_loc(f'{coluna}_{janela}')] = somas
+    return serie
+
+# Função para montar a série a partir dos totais diários, preenchendo os dias sem tarefas com zero
+def montar_serie(totais):
+    if totais.empty:
+        return serie_vazia()
+    calendario = pd.date_range(totais.index.min(), totais.index.max(), freq='D', name='Dia')
+    serie = serie_vazia().reindex(calendario, fill_value=0.0)
+    serie[COLUNAS_TOTAIS] = totais[COLUNAS_TOTAIS].reindex(calendario, fill_value=0.0).to_numpy(dtype=float)
+    return recalcular_trecho(serie, 0, len(serie) - 1)
+
+# Função para somar os totais diários de uma carga na série e recalcular apenas as janelas afetadas
+def atualizar_serie(serie, totais):
+    totais = totais[totais['Quantidade'] > 0]
+    if totais.empty:
+        return serie
+    if serie.empty:
+        return montar_serie(totais)
+
+    # Estende o calendário quando a carga traz dias antes do início ou depois do fim da série
+    fim_anterior = len(serie) - 1
+    inicio, fim = min(serie.index.min(), totais.index.min()), max(serie.index.max(), totais.index.max())
+    if inicio < serie.index.min() or fim > serie.index.max():
+        deslocamento = (serie.index.min() - inicio).days
+        serie = serie.reindex(pd.date_range(inicio, fim, freq='D', name='Dia'), fill_value=0.0)
+        fim_anterior += deslocamento
+
+    posicoes = serie.index.get_indexer(totais.index)
+    for coluna in COLUNAS_TOTAIS:
+        indice_coluna = serie.columns.get_loc(coluna)
+        serie.iloc[posicoes, indice_coluna] = serie.iloc[posicoes, indice_coluna].to_numpy() + totais[coluna].to_numpy()
+
+    # Os dias novos depois do fim anterior (inclusive os vazios entre eles) também precisam das janelas calculadas
+    inicio_trecho = min(posicoes.min(), fim_anterior + 1)
+    fim_trecho = min(max(posicoes.max(), fim_anterior) + MAIOR_JANELA - 1, len(serie) - 1)
+    return recalcular_trecho(serie, inicio_trecho, fim_trecho)
+
+# Função para calcular os totais diários (quantidade e tempo em segundos) das tarefas finalizadas ou canceladas
+# Tempos inválidos somam zero mas a tarefa conta, igual ao cálculo do TMO na dashboard
+def totais_diarios(df):
+    df = df[df['SITUAÇÃO DA TAREFA'].isin(['Finalizada', 'Cancelada'])].dropna(subset=['DATA DE CONCLUSÃO DA TAREFA'])
+    totais = pd.DataFrame({
+        'Dia': df['DATA DE CONCLUSÃO DA TAREFA'].dt.normalize(),
+        'USUÁRIO QUE CONCLUIU A TAREFA': df['USUÁRIO QUE CONCLUIU A TAREFA'].fillna(''),
+        'Quantidade': 1.0,
+        'Tempo_Total': df['TEMPO MÉDIO OPERACIONAL'].dt.total_seconds().fillna(0)
+    })
+    return totais.groupby(['USUÁRIO QUE CONCLUIU A TAREFA', 'Dia'])[COLUNAS_TOTAIS].sum()
+
+# Componente dos rollups: séries da equipe e de cada analista
+def calcular_janelas(df):
+    totais = totais_diarios(df)
+    return {
+        'equipe': montar_serie(totais.groupby(level='Dia').sum()),
+        'analistas': {analista: montar_serie(totais_analista.droplevel(0)) for analista, totais_analista in totais.groupby(level=0)}
+    }
+
+def mesclar_janelas(atual, novas):
+    analistas = dict(atual['analistas'])
+    for analista, serie in novas['analistas'].items():
+        analistas[analista] = atualizar_serie(analistas.get(analista, serie_vazia()), serie[COLUNAS_TOTAIS])
+    return {'equipe': atualizar_serie(atual['equipe'], novas['equipe'][COLUNAS_TOTAIS]), 'analistas': analistas}
+
+# Função para obter as séries móveis do período, da equipe ou de um analista:
+# produtividade média por dia e TMO de cada janela (as janelas do início do período usam os dias anteriores a ele)
+def series_moveis(janelas, data_inicial, data_final, analista=None):
+    serie = janelas['equipe'] if analista is None else janelas['analistas'].get(analista, serie_vazia())
+    serie = serie.loc[pd.Timestamp(data_inicial):pd.Timestamp(data_final)]
+    resultado = pd.DataFrame({'Dia': serie.index})
+    for janela in JANELAS:
+        quantidade = serie[f'Quantidade_{janela}'].to_numpy()
+        tempo = serie[f'Tempo_Total_{janela}'].to_numpy()
+        resultado[f'Produtividade_{janela}'] = quantidade / janela
+        segundos = np.divide(tempo, quantidade, out=np.zeros_like(tempo), where=quantidade > 0)
+        resultado[f'TMO_{janela}'] = pd.to_timedelta(segundos, unit='s')
+    return resultado
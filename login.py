@@ -1,13 +1,66 @@
 import streamlit as st
+import os
+import glob
+import threading
+import time
 
 # Dicionário com usuários e senhas
 usuarios = {"usuario1": "senha1", "usuario2": "senha2", "viviane@bv": "f1nch"}
 
+# Usuários com acesso ao comparativo entre equipes
+gestores = {"viviane@bv"}
+
 # Função para autenticar usuário
 def autenticar(usuario, senha):
     return usuario in usuarios and usuarios[usuario] == senha
 
+# Espera antes da primeira verificação de ociosidade (o mesmo intervalo de dados.SEGUNDOS_OCIOSO) e pastas de entrada
+# e intervalo de verificação da ingestão (os mesmos de ingestao.PREFIXO_ENTRADA e ingestao.SEGUNDOS_VERIFICACAO)
+SEGUNDOS_ANTES_PRE_AQUECIMENTO = 300
+PASTAS_ENTRADA = 'entrada_*'
+SEGUNDOS_VERIFICACAO_PASTAS = 30
+
+# Aquecimento do cache em segundo plano: o módulo de dados (pandas) é importado dentro da thread
+# para que a tela de login continue dependendo apenas do streamlit
+def _aquecer(usuario):
+    from dados import aquecer_cache, registrar_acesso
+    registrar_acesso(usuario)
+    aquecer_cache(usuario)
+
+# As threads iniciadas com o processo só importam pandas, openpyxl e pyarrow quando têm trabalho a fazer,
+# para não disputar o GIL com a primeira renderização da tela de login
+def _pre_aquecer_quando_ocioso():
+    time.sleep(SEGUNDOS_ANTES_PRE_AQUECIMENTO)
+    from dados import pre_aquecer_quando_ocioso
+    pre_aquecer_quando_ocioso()
+
+def _vigiar_pastas():
+    while not any(os.path.isdir(pasta) for pasta in glob.glob(PASTAS_ENTRADA)):
+        time.sleep(SEGUNDOS_VERIFICACAO_PASTAS)
+    from ingestao import vigiar_pastas
+    vigiar_pastas()
+
+# Função para começar a carregar os dados e agregados do usuário assim que as credenciais são aceitas
+def iniciar_aquecimento(usuario):
+    threading.Thread(target=_aquecer, args=(usuario,), daemon=True).start()
+
+# Inicia uma única vez por processo a thread que pré-aquece as equipes mais usadas quando o servidor está ocioso
+@st.cache_resource(show_spinner=False)
+def iniciar_pre_aquecimento():
+    thread = threading.Thread(target=_pre_aquecer_quando_ocioso, daemon=True)
+    thread.start()
+    return thread
+
+# Inicia uma única vez por processo a thread que ingere as planilhas colocadas nas pastas de entrada das equipes
+# Chamada pelo app.py em toda execução, antes e independente do login
+@st.cache_resource(show_spinner=False)
+def iniciar_vigia_pastas():
+    thread = threading.Thread(target=_vigiar_pastas, daemon=True)
+    thread.start()
+    return thread
+
 def login():
+    iniciar_pre_aquecimento()
     st.logo("https://finchsolucoes.com.br/img/eb28739f-bef7-4366-9a17-6d629cf5e0d9.png")
     st.sidebar.header("Login")
     usuario = st.sidebar.text_input("Usuário")
@@ -17,6 +70,7 @@ def login():
 
     if st.sidebar.button("Entrar"):
         if autenticar(usuario, senha):
+            iniciar_aquecimento(usuario)
             st.session_state.logado = True
             st.session_state.usuario_logado = usuario  # Armazena o usuário logado
             st.sidebar.success("Login bem-sucedido!")
@@ -0,0 +1,182 @@
+import pandas as pd
+
+# Função para formatar timedelta no formato HH:MM:SS
+def format_timedelta(td):
+    if pd.isnull(td):
+        return "0 min"
+    total_seconds = int(td.total_seconds())
+    minutes, seconds = divmod(total_seconds, 60)
+    return f"{minutes} min {seconds}s"
+
+# Função para calcular o TMO por dia
+def calcular_tmo_por_dia(df):
+    df['Dia'] = pd.to_datetime(df['DATA DE CONCLUSÃO DA TAREFA']).dt.date
+    df_finalizados = df[df['SITUAÇÃO DA TAREFA'].isin(['Finalizada', 'Cancelada'])].copy()
+    
+    # Agrupando por dia
+    df_tmo = df_finalizados.groupby('Dia').agg(
+        Tempo_Total=('TEMPO MÉDIO OPERACIONAL', 'sum'),  # Soma total do tempo
+        Total_Finalizados_Cancelados=('SITUAÇÃO DA TAREFA', 'count')  # Total de tarefas finalizadas ou canceladas
+    ).reset_index()
+
+    # Calcula o TMO (Tempo Médio Operacional)
+    df_tmo['TMO'] = df_tmo['Tempo_Total'] / df_tmo['Total_Finalizados_Cancelados']
+    
+    # Formata o tempo médio no formato HH:MM:SS
+    df_tmo['TMO'] = df_tmo['TMO'].apply(format_timedelta)
+    return df_tmo[['Dia', 'TMO']]
+
+def calcular_tmo_por_dia_geral(df):
+    # Certifica-se de que a coluna de data está no formato correto
+    df['Dia'] = pd.to_datetime(df['DATA DE CONCLUSÃO DA TAREFA']).dt.date
+
+    # Filtra tarefas finalizadas ou canceladas, pois estas são relevantes para o cálculo do TMO
+    df_finalizados = df[df['SITUAÇÃO DA TAREFA'].isin(['Finalizada', 'Cancelada'])].copy()
+    
+    # Agrupamento por dia para calcular o tempo médio diário
+    df_tmo = df_finalizados.groupby('Dia').agg(
+        Tempo_Total=('TEMPO MÉDIO OPERACIONAL', 'sum'),  # Soma total do tempo por dia
+        Total_Finalizados_Cancelados=('SITUAÇÃO DA TAREFA', 'count')  # Total de tarefas finalizadas/canceladas por dia
+    ).reset_index()
+
+    # Calcula o TMO (Tempo Médio Operacional) diário
+    df_tmo['TMO'] = df_tmo['Tempo_Total'] / df_tmo['Total_Finalizados_Cancelados']
+    
+    # Remove valores nulos e formata o tempo médio para o gráfico
+    df_tmo['TMO'] = df_tmo['TMO'].fillna(pd.Timedelta(seconds=0))  # Preenche com zero se houver NaN
+    df_tmo['TMO_Formatado'] = df_tmo['TMO'].apply(format_timedelta)  # Formata para exibição
+    
+    return df_tmo[['Dia', 'TMO', 'TMO_Formatado', 'Tempo_Total', 'Total_Finalizados_Cancelados']]
+
+def calcular_produtividade_diaria(df):
+    # Garante que a coluna 'Próximo' esteja em formato de data
+    df['Dia'] = df['DATA DE CONCLUSÃO DA TAREFA'].dt.date
+
+    # Agrupa e soma os status para calcular a produtividade
+    df_produtividade = df.groupby('Dia').agg(
+        Finalizado=('SITUAÇÃO DA TAREFA', lambda x: x[x == 'Finalizada'].count()),
+        Cancelada=('SITUAÇÃO DA TAREFA', lambda x: x[x == 'Cancelada'].count())
+    ).reset_index()
+
+    # Calcula a produtividade total
+    df_produtividade['Produtividade'] = + df_produtividade['Finalizado'] + df_produtividade['Cancelada']
+    return df_produtividade
+
+# Função para calcular o TMO por analista
+def calcular_tmo_por_analista(df):
+    df_finalizados = df[df['SITUAÇÃO DA TAREFA'].isin(['Finalizada', 'Cancelada'])].copy()
+
+    # Agrupando por analista
+    df_tmo_analista = df_finalizados.groupby('USUÁRIO QUE CONCLUIU A TAREFA').agg(
+        Tempo_Total=('TEMPO MÉDIO OPERACIONAL', 'sum'),  # Soma total do tempo por analista
+        Total_Tarefas=('SITUAÇÃO DA TAREFA', 'count')  # Total de tarefas finalizadas ou canceladas por analista
+    ).reset_index()
+
+    # Calcula o TMO (Tempo Médio Operacional) como média
+    df_tmo_analista['TMO'] = df_tmo_analista['Tempo_Total'] / df_tmo_analista['Total_Tarefas']
+
+    # Formata o tempo médio no formato de minutos e segundos
+    df_tmo_analista['TMO_Formatado'] = df_tmo_analista['TMO'].apply(format_timedelta)
+    return df_tmo_analista[['USUÁRIO QUE CONCLUIU A TAREFA', 'TMO_Formatado', 'TMO']]
+
+# Função para calcular de uma vez os agregados da Visão Geral (totais, séries diárias, finalizações e TMO por analista)
+def calcular_visao_geral(df):
+    total_finalizados = len(df[df['SITUAÇÃO DA TAREFA'] == 'Finalizada'])
+    total_reclass = len(df[df['SITUAÇÃO DA TAREFA'] == 'Cancelada'])
+    # Verifique se o denominador não é zero
+    if (total_finalizados + total_reclass) > 0:
+        tempo_medio = (df[df['SITUAÇÃO DA TAREFA'] == 'Finalizada']['TEMPO MÉDIO OPERACIONAL'].sum() + 
+                    df[df['SITUAÇÃO DA TAREFA'] == 'Cancelada']['TEMPO MÉDIO OPERACIONAL'].sum()) / (total_finalizados + total_reclass)
+    else:
+        tempo_medio = pd.Timedelta(0)
+
+    return {
+        'total_finalizados': total_finalizados,
+        'total_reclass': total_reclass,
+        'tempo_medio': tempo_medio,
+        'df_produtividade': calcular_produtividade_diaria(df.copy()),
+        'df_tmo': calcular_tmo_por_dia_geral(df.copy()),
+        'df_tmo_analista': calcular_tmo_por_analista(df),
+        'total_completa': len(df[df['FINALIZAÇÃO'] == 'Subsídio Completo']),
+        'total_parcial': len(df[df['FINALIZAÇÃO'] == 'Subsídio Parcial']),
+        'total_nao_tratada': len(df[df['FINALIZAÇÃO'] == 'Fora do Escopo'])
+    }
+
+# Função para calcular os totais e o tempo médio por cadastro de um analista
+def calcular_totais_analista(df_analista):
+    total_finalizados = len(df_analista[df_analista['SITUAÇÃO DA TAREFA'] == 'Finalizada'])
+    total_reclass = len(df_analista[df_analista['SITUAÇÃO DA TAREFA'] == 'Cancelada'])
+    # Verifique se o denominador não é zero
+    if (total_finalizados + total_reclass) > 0:
+        tempo_medio = (df_analista[df_analista['SITUAÇÃO DA TAREFA'] == 'Finalizada']['TEMPO MÉDIO OPERACIONAL'].sum() + 
+                    df_analista[df_analista['SITUAÇÃO DA TAREFA'] == 'Cancelada']['TEMPO MÉDIO OPERACIONAL'].sum()) / (total_finalizados + total_reclass)
+    else:
+        tempo_medio = pd.Timedelta(0)
+
+    return {
+        'total_geral': total_finalizados + total_reclass,
+        'total_finalizados': total_finalizados,
+        'total_reclass': total_reclass,
+        'tempo_medio': tempo_medio
+    }
+
+# Função para calcular o TMO da equipe (média das tarefas finalizadas)
+def calcular_tmo_equipe(df):
+    return df[df['SITUAÇÃO DA TAREFA'] == 'Finalizada']['TEMPO MÉDIO OPERACIONAL'].mean()
+
+# Função para calcular a quantidade e o TMO médio de cada fila finalizada pelo analista
+def calcular_filas_analista(df_analista):
+    # Filtrar apenas as tarefas finalizadas para cálculo do TMO
+    filas_finalizadas_analista = df_analista[df_analista['SITUAÇÃO DA TAREFA'] == 'Finalizada']
+
+    # Agrupa por 'FILA' e calcula a quantidade e o TMO médio para cada fila
+    carteiras_analista = filas_finalizadas_analista.groupby('FILA').agg(
+        Quantidade=('FILA', 'size'),
+        TMO_médio=('TEMPO MÉDIO OPERACIONAL', 'mean')
+    ).reset_index()
+
+    # Renomeia as colunas
+    return carteiras_analista.rename(columns={'FILA': 'Fila', 'Quantidade': 'Quantidade', 'TMO_médio': 'TMO Médio por Fila'})
+
+# Função para calcular a quantidade de pastas, requisições e o tempo de análise de cada protocolo finalizado pelo analista
+def calcular_protocolos_analista(df_analista):
+    # Filtrar apenas as tarefas finalizadas para cálculo do TMO
+    filas_finalizadas_analista = df_analista[df_analista['SITUAÇÃO DA TAREFA'] == 'Finalizada'].copy()
+
+    # Contar a quantidade de pastas preenchidas para cada protocolo
+    pasta_columns = [col for col in filas_finalizadas_analista.columns if col.startswith('PASTA')]
+    filas_finalizadas_analista['Quantidade de Pastas'] = filas_finalizadas_analista[pasta_columns].notna().sum(axis=1)
+
+    # Verificar a quantidade de requisições
+    filas_finalizadas_analista['Número de Requisições'] = filas_finalizadas_analista['NÚMERO REQUISIÇÃO'].notna().astype(int)
+
+    filas_finalizadas_analista['ID Projuris'] = filas_finalizadas_analista['ID PROJURIS'].notna().astype(int)
+
+    # Agrupar os dados por 'NÚMERO DO PROTOCOLO' e 'FILA'
+    protocolos_analista = filas_finalizadas_analista.groupby(['NÚMERO DO PROTOCOLO', 'FILA']).agg(
+        Quantidade_de_Pastas=('Quantidade de Pastas', 'first'),
+        Número_de_Requisições=('Número de Requisições', 'first'),
+        ID_Projuris=('ID Projuris', 'first'),
+        TMO_médio=('TEMPO MÉDIO OPERACIONAL', 'mean')
+    ).reset_index()
+
+    # Ajustar a quantidade de pastas para exibir 0 caso não haja pastas
+    protocolos_analista['Quantidade_de_Pastas'] = protocolos_analista['Quantidade_de_Pastas'].fillna(0)
+
+    # Renomear as colunas para exibição
+    return protocolos_analista.rename(columns={
+        'NÚMERO DO PROTOCOLO': 'Número do Protocolo',
+        'FILA': 'Fila',
+        'Quantidade_de_Pastas': 'Quantidade de Pastas',
+        'Número_de_Requisições': 'Número de Requisições',
+        'ID_Projuris': 'ID Projuris',
+        'TMO_médio': 'Tempo de Análise por Protocolo'
+    })
+
+# Função para contar as finalizações (Subsídio Completo, Parcial e Fora do Escopo)
+def contar_finalizacoes(df):
+    return {
+        'Subsídio Parcial': len(df[df['FINALIZAÇÃO'] == 'Subsídio Parcial']),
+        'Fora do Escopo': len(df[df['FINALIZAÇÃO'] == 'Fora do Escopo']),
+        'Subsídio Completo': len(df[df['FINALIZAÇÃO'] == 'Subsídio Completo'])
+    }
@@ -0,0 +1,263 @@
+import os
+import json
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, timedelta
+import pandas as pd
+from dados import load_data, trava_usuario, convert_to_timedelta_for_calculations, convert_to_datetime_for_calculations, MAX_USUARIOS_EM_CACHE
+from rollups import obter_rollups, rollups_atualizados
+
+# Histórico de cada usuário em partições mensais (parquet comprimido). A planilha acumulada é importada uma vez,
+# quando ainda não há partições; a partir daí cada carga só grava as linhas novas nas partições dos meses afetados
+# e atualiza o índice, sem reescrever o histórico. As partições passam a ser a fonte dos dados: a planilha não recebe
+# as cargas, então um índice perdido ou de formato antigo é refeito a partir das partições.
+# Os meses da janela recente ficam na memória do processo; os meses antigos só são lidos do disco
+# quando o filtro de datas chega até eles, e os totais do histórico continuam vindo dos rollups.
+# O índice das partições também serve de manifesto do conjunto de dados (linhas, datas extremas, analistas,
+# filas e finalizações), para que os filtros da dashboard sejam montados sem tocar nas linhas.
+
+JANELA_QUENTE_DIAS = 90
+MAX_MESES_FRIOS_EM_CACHE = 12
+COMPRESSAO = 'zstd'
+MES_SEM_DATA = 'sem_data'
+VERSAO_ESQUEMA = 2
+
+_indices = {}
+_meses_quentes = OrderedDict()
+_meses_frios = OrderedDict()
+_trava = threading.Lock()
+
+# Funções para montar os caminhos da pasta de partições do usuário
+def pasta_particoes(usuario):
+    return f'particoes_{usuario}'
+
+def arquivo_particao(usuario, mes):
+    return os.path.join(pasta_particoes(usuario), f'{mes}.parquet')
+
+def arquivo_indice(usuario):
+    return os.path.join(pasta_particoes(usuario), 'indice.json')
+
+# Funções para ler e gravar o índice das partições (manifesto com a versão dos dados, colunas, linhas por mês e valores distintos)
+def ler_indice(usuario):
+    try:
+        with open(arquivo_indice(usuario), 'r', encoding='utf-8') as file:
+            return json.load(file)
+    except (FileNotFoundError, ValueError):
+        return None
+
+def salvar_indice(usuario, indice):
+    arquivo_temporario = arquivo_indice(usuario) + '.tmp'
+    with open(arquivo_temporario, 'w', encoding='utf-8') as file:
+        json.dump(indice, file, ensure_ascii=False)
+    os.replace(arquivo_temporario, arquivo_indice(usuario))
+    with _trava:
+        _indices[usuario] = indice
+
+# Função para identificar o mês (AAAA-MM) de cada tarefa; tarefas sem data de conclusão ficam numa partição à parte
+def mes_das_tarefas(df):
+    return df['DATA DE CONCLUSÃO DA TAREFA'].dt.strftime('%Y-%m').fillna(MES_SEM_DATA)
+
+# Função para deixar cada coluna com um único tipo, já que as colunas lidas do Excel podem misturar números e textos
+def preparar_para_parquet(df):
+    df = df.copy()
+    for coluna in df.columns[df.dtypes == object]:
+        if pd.api.types.infer_dtype(df[coluna], skipna=True).startswith('mixed'):
+            df[coluna] = df[coluna].where(df[coluna].isna(), df[coluna].astype(str))
+    return df
+
+# Função para gravar a partição de um mês
+def gravar_particao(usuario, mes, df_mes):
+    arquivo_temporario = arquivo_particao(usuario, mes) + '.tmp'
+    preparar_para_parquet(df_mes).to_parquet(arquivo_temporario, index=False, compression=COMPRESSAO)
+    os.replace(arquivo_temporario, arquivo_particao(usuario, mes))
+
+# Função para listar os valores distintos de uma coluna como texto (vazia se a coluna não existir)
+def valores_distintos(df, coluna):
+    if coluna not in df.columns:
+        return []
+    return sorted(str(valor) for valor in df[coluna].dropna().unique())
+
+# Função para atualizar o manifesto do índice com as linhas de um DataFrame (carga completa ou só as linhas novas)
+def atualizar_manifesto(indice, df):
+    indice['linhas'] += len(df)
+    for chave, coluna in [('analistas', 'USUÁRIO QUE CONCLUIU A TAREFA'), ('filas', 'FILA'), ('finalizacoes', 'FINALIZAÇÃO')]:
+        indice[chave] = sorted(set(indice[chave]) | set(valores_distintos(df, coluna)))
+
+    datas = df['DATA DE CONCLUSÃO DA TAREFA'].dropna()
+    if datas.empty:
+        return indice
+    data_minima, data_maxima = datas.min().date().isoformat(), datas.max().date().isoformat()
+    if indice['data_minima'] is None or data_minima < indice['data_minima']:
+        indice['data_minima'] = data_minima
+    if indice['data_maxima'] is None or data_maxima > indice['data_maxima']:
+        indice['data_maxima'] = data_maxima
+    return indice
+
+# Função para gerar uma nova versão dos dados, a cada importação ou carga (chave dos caches e dos agregados)
+def nova_versao(usuario):
+    return f"{usuario}-{time.time_ns()}"
+
+# Função para montar o índice das partições com o manifesto das linhas do DataFrame completo
+def montar_indice(usuario, df_total, linhas):
+    indice = {
+        'versao_esquema': VERSAO_ESQUEMA, 'versao': nova_versao(usuario), 'colunas': list(df_total.columns), 'meses': linhas, 'linhas': 0,
+        'data_minima': None, 'data_maxima': None, 'analistas': [], 'filas': [], 'finalizacoes': []
+    }
+    return atualizar_manifesto(indice, df_total)
+
+# Função para listar os meses que já têm partição gravada
+def meses_gravados(usuario):
+    if not os.path.isdir(pasta_particoes(usuario)):
+        return []
+    return sorted(arquivo[:-len('.parquet')] for arquivo in os.listdir(pasta_particoes(usuario)) if arquivo.endswith('.parquet'))
+
+# Função para reescrever todas as partições a partir do DataFrame completo (importação da planilha acumulada)
+def compactar_particoes(usuario, df_total):
+    os.makedirs(pasta_particoes(usuario), exist_ok=True)
+    linhas = {}
+    for mes, df_mes in df_total.groupby(mes_das_tarefas(df_total), sort=True):
+        gravar_particao(usuario, mes, df_mes)
+        linhas[mes] = len(df_mes)
+
+    # Remove partições de meses que não existem mais nos dados
+    for arquivo in os.listdir(pasta_particoes(usuario)):
+        if arquivo.endswith('.parquet') and arquivo[:-len('.parquet')] not in linhas:
+            os.remove(os.path.join(pasta_particoes(usuario), arquivo))
+
+    indice = montar_indice(usuario, df_total, linhas)
+    salvar_indice(usuario, indice)
+    return indice
+
+# Função para refazer o índice a partir das partições gravadas, sem reescrevê-las
+# Retorna o índice e o histórico lido, para que os agregados sejam recalculados com as mesmas linhas
+def reindexar_particoes(usuario):
+    partes = {mes: pd.read_parquet(arquivo_particao(usuario, mes)) for mes in meses_gravados(usuario)}
+    df_total = pd.concat(partes.values(), ignore_index=True)
+    indice = montar_indice(usuario, df_total, {mes: len(parte) for mes, parte in partes.items()})
+    salvar_indice(usuario, indice)
+    return indice, df_total
+
+# Função para verificar se o índice existe e está no formato atual do manifesto
+def indice_atual(indice):
+    return indice is not None and indice.get('versao_esquema') == VERSAO_ESQUEMA
+
+# Função para obter o índice das partições do usuário e os agregados da mesma versão, conferidos sob a trava do usuário
+# (uma carga de outra sessão ou da pasta monitorada pode trocar a versão logo depois de a trava ser liberada)
+# A planilha acumulada só é lida enquanto não há partições; um índice ausente ou de formato antigo é refeito a partir
+# das partições, e os agregados que faltarem são recalculados a partir delas
+def obter_particoes_e_rollups(usuario):
+    with trava_usuario(usuario):
+        with _trava:
+            indice = _indices.get(usuario)
+        if indice is None:
+            indice = ler_indice(usuario)
+
+        if not indice_atual(indice) and meses_gravados(usuario):
+            indice, df_total = reindexar_particoes(usuario)
+            return indice, obter_rollups(usuario, indice['versao'], df_total)
+
+        if not indice_atual(indice):
+            df_total = load_data(usuario)
+            df_total = convert_to_timedelta_for_calculations(df_total)
+            df_total = convert_to_datetime_for_calculations(df_total)
+            indice = compactar_particoes(usuario, df_total)
+            return indice, obter_rollups(usuario, indice['versao'], df_total)
+
+        rollups = rollups_atualizados(usuario, indice['versao'])
+        if rollups is None:
+            rollups = obter_rollups(usuario, indice['versao'], carregar_historico(usuario, indice))
+        with _trava:
+            _indices[usuario] = indice
+        return indice, rollups
+
+# Função para obter apenas o índice das partições do usuário
+def obter_particoes(usuario):
+    return obter_particoes_e_rollups(usuario)[0]
+
+# Função chamada após uma carga: grava as linhas novas apenas nas partições dos meses afetados e atualiza o índice
+# Retorna a versão anterior e a nova, para que os agregados sejam atualizados com as mesmas linhas
+def atualizar_particoes(usuario, df_novos):
+    with trava_usuario(usuario):
+        versao_anterior = obter_particoes(usuario)['versao']
+        indice = ler_indice(usuario)  # Cópia própria, o índice em cache continua válido para as sessões até ser substituído
+        for mes, df_mes in df_novos.groupby(mes_das_tarefas(df_novos), sort=True):
+            if mes in indice['meses']:
+                df_mes = pd.concat([pd.read_parquet(arquivo_particao(usuario, mes)), df_mes], ignore_index=True)
+            gravar_particao(usuario, mes, df_mes)
+            indice['meses'][mes] = len(df_mes)
+        indice['colunas'] += [coluna for coluna in df_novos.columns if coluna not in indice['colunas']]
+        indice['versao'] = nova_versao(usuario)
+        salvar_indice(usuario, atualizar_manifesto(indice, df_novos))
+    return versao_anterior, indice['versao']
+
+# Função para obter as datas extremas do histórico (hoje quando ainda não há dados)
+def limites_datas(indice):
+    if indice['data_maxima'] is None:
+        hoje = date.today()
+        return hoje, hoje
+    return date.fromisoformat(indice['data_minima']), date.fromisoformat(indice['data_maxima'])
+
+# Função para calcular o período padrão dos filtros: a janela quente que termina na última data com dados
+def periodo_padrao(indice):
+    data_minima, data_maxima = limites_datas(indice)
+    return max(data_minima, data_maxima - timedelta(days=JANELA_QUENTE_DIAS)), data_maxima
+
+# Função para listar os analistas do manifesto (na mesma ordem) que têm tarefas no DataFrame do período
+def analistas_do_periodo(indice, df):
+    presentes = set(df['USUÁRIO QUE CONCLUIU A TAREFA'].dropna().astype(str))
+    return [analista for analista in indice['analistas'] if analista in presentes]
+
+# Função para listar os meses com partição que cruzam o período
+def meses_do_periodo(indice, data_inicial, data_final):
+    inicio, fim = data_inicial.strftime('%Y-%m'), data_final.strftime('%Y-%m')
+    return [mes for mes in sorted(indice['meses']) if mes != MES_SEM_DATA and inicio <= mes <= fim]
+
+# Função para ler a partição de um mês, guardando os meses quentes por usuário e os frios num cache limitado
+def carregar_mes(usuario, indice, mes, quente):
+    versao = indice['versao']
+    with _trava:
+        versao_quente, meses = _meses_quentes.get(usuario, (None, {}))
+        if versao_quente == versao and mes in meses:
+            return meses[mes]
+        if (usuario, versao, mes) in _meses_frios:
+            _meses_frios.move_to_end((usuario, versao, mes))
+            return _meses_frios[(usuario, versao, mes)]
+
+    with trava_usuario(usuario):
+        df_mes = pd.read_parquet(arquivo_particao(usuario, mes))
+
+    with _trava:
+        if quente:
+            versao_quente, meses = _meses_quentes.get(usuario, (None, {}))
+            if versao_quente != versao:
+                meses = {}
+            meses[mes] = df_mes
+            _meses_quentes[usuario] = (versao, meses)
+            _meses_quentes.move_to_end(usuario)
+            while len(_meses_quentes) > MAX_USUARIOS_EM_CACHE:
+                _meses_quentes.popitem(last=False)
+        else:
+            _meses_frios[(usuario, versao, mes)] = df_mes
+            while len(_meses_frios) > MAX_MESES_FRIOS_EM_CACHE:
+                _meses_frios.popitem(last=False)
+    return df_mes
+
+# Função para juntar as partições lidas em um DataFrame com as colunas do índice
+def juntar_particoes(indice, partes):
+    if not partes:
+        df_vazio = pd.DataFrame(columns=indice['colunas'])
+        return convert_to_datetime_for_calculations(convert_to_timedelta_for_calculations(df_vazio))
+    return pd.concat(partes, ignore_index=True).reindex(columns=indice['colunas'])
+
+# Função para montar o DataFrame do período a partir das partições mensais (um novo DataFrame a cada chamada)
+def carregar_periodo(usuario, indice, data_inicial, data_final):
+    inicio_quente = periodo_padrao(indice)[0].strftime('%Y-%m')
+    partes = [carregar_mes(usuario, indice, mes, mes >= inicio_quente) for mes in meses_do_periodo(indice, data_inicial, data_final)]
+    return juntar_particoes(indice, partes)
+
+# Função para ler o histórico completo, inclusive as tarefas sem data, direto das partições (sem passar pelos caches)
+def carregar_historico(usuario, indice):
+    with trava_usuario(usuario):
+        partes = [pd.read_parquet(arquivo_particao(usuario, mes)) for mes in sorted(indice['meses'])]
+    return juntar_particoes(indice, partes)
@@ -0,0 +1,155 @@
+import argparse
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import date
+
+import pandas as pd
+import plotly.express as px
+
+from dados import listar_usuarios
+from particoes import obter_particoes, carregar_historico
+from metricas import format_timedelta, calcular_visao_geral, calcular_totais_analista, calcular_tmo_equipe, calcular_filas_analista, contar_finalizacoes
+from graficos import grafico_produtividade, grafico_tmo_equipe
+
+# Gera os relatórios diários de KPIs sem passar pelo servidor do Streamlit, por exemplo agendado no cron:
+#   0 6 * * * cd /caminho/da/dashboard && python relatorios.py --saida relatorios
+
+custom_colors = ['#ff571c', '#7f2b0e', '#4c1908', '#ff884d', '#a34b28', '#331309']
+
+# Função para carregar os dados do usuário no mesmo formato usado pela dashboard, opcionalmente filtrando o período
+def carregar_periodo(usuario, data_inicial=None, data_final=None):
+    df_total = carregar_historico(usuario, obter_particoes(usuario))
+    if data_inicial is not None:
+        df_total = df_total[df_total['DATA DE CONCLUSÃO DA TAREFA'].dt.date >= data_inicial]
+    if data_final is not None:
+        df_total = df_total[df_total['DATA DE CONCLUSÃO DA TAREFA'].dt.date <= data_final]
+    return df_total
+
+# Função para montar a tabela de métricas individuais de todos os analistas
+def calcular_metricas_analistas(df_total):
+    tmo_equipe = calcular_tmo_equipe(df_total)
+    linhas = []
+    for analista, df_analista in df_total.groupby('USUÁRIO QUE CONCLUIU A TAREFA'):
+        totais = calcular_totais_analista(df_analista)
+        linhas.append({
+            'Analista': analista,
+            'Total Geral': totais['total_geral'],
+            'Tarefas Finalizadas': totais['total_finalizados'],
+            'Tarefas Canceladas': totais['total_reclass'],
+            'Tempo Médio por Cadastro': totais['tempo_medio'],
+            'Acima do TMO da Equipe': bool(not pd.isnull(tmo_equipe) and totais['tempo_medio'] > tmo_equipe)
+        })
+    colunas = ['Analista', 'Total Geral', 'Tarefas Finalizadas', 'Tarefas Canceladas', 'Tempo Médio por Cadastro', 'Acima do TMO da Equipe']
+    return pd.DataFrame(linhas, columns=colunas)
+
+# Função para montar a tabela de filas de todos os analistas
+def calcular_filas_analistas(df_total):
+    if 'FILA' not in df_total.columns:
+        return pd.DataFrame(columns=['Analista', 'Fila', 'Quantidade', 'TMO Médio por Fila'])
+    tabelas = []
+    for analista, df_analista in df_total.groupby('USUÁRIO QUE CONCLUIU A TAREFA'):
+        filas = calcular_filas_analista(df_analista)
+        filas.insert(0, 'Analista', analista)
+        tabelas.append(filas)
+    if not tabelas:
+        return pd.DataFrame(columns=['Analista', 'Fila', 'Quantidade', 'TMO Médio por Fila'])
+    return pd.concat(tabelas, ignore_index=True)
+
+# Função para converter uma tabela em HTML formatando as colunas de tempo
+def tabela_html(df, colunas_tempo):
+    df = df.copy()
+    for coluna in colunas_tempo:
+        df[coluna] = df[coluna].apply(format_timedelta)
+    return df.to_html(index=False, border=0, justify='left')
+
+# Função para gerar o pacote de relatório (HTML + Parquet) de um usuário; executada em um processo separado
+def gerar_relatorio(usuario, pasta_saida, data_inicial=None, data_final=None):
+    df_total = carregar_periodo(usuario, data_inicial, data_final)
+    pasta_usuario = os.path.join(pasta_saida, usuario)
+    os.makedirs(pasta_usuario, exist_ok=True)
+
+    visao_geral = calcular_visao_geral(df_total)
+    metricas_analistas = calcular_metricas_analistas(df_total)
+    filas_analistas = calcular_filas_analistas(df_total)
+    finalizacoes = contar_finalizacoes(df_total)
+
+    resumo = pd.DataFrame([{
+        'Usuário': usuario,
+        'Total Geral': visao_geral['total_finalizados'] + visao_geral['total_reclass'],
+        'Total Tarefas Finalizadas': visao_geral['total_finalizados'],
+        'Total Tarefas Canceladas': visao_geral['total_reclass'],
+        'Tempo Médio por Cadastro': visao_geral['tempo_medio'],
+        **finalizacoes
+    }])
+
+    # Tabelas em Parquet para consumo por outras ferramentas
+    tabelas = {
+        'resumo': resumo,
+        'produtividade_diaria': visao_geral['df_produtividade'],
+        'tmo_diario': visao_geral['df_tmo'][['Dia', 'TMO', 'Tempo_Total', 'Total_Finalizados_Cancelados']],
+        'tmo_por_analista': visao_geral['df_tmo_analista'][['USUÁRIO QUE CONCLUIU A TAREFA', 'TMO']],
+        'metricas_analistas': metricas_analistas,
+        'filas_analistas': filas_analistas
+    }
+    for nome, tabela in tabelas.items():
+        tabela.to_parquet(os.path.join(pasta_usuario, f'{nome}.parquet'), index=False)
+
+    # Página HTML estática com os mesmos indicadores e gráficos da Visão Geral
+    fig_status = px.pie(names=list(finalizacoes), values=list(finalizacoes.values()), color_discrete_sequence=custom_colors)
+    graficos = [
+        ('Produtividade Diária', grafico_produtividade(visao_geral['df_produtividade'], custom_colors)),
+        ('TMO por Dia da Equipe', grafico_tmo_equipe(visao_geral['df_tmo'], custom_colors)),
+        ('Status de Finalização das Tarefas', fig_status)
+    ]
+    periodo = f"{data_inicial or 'início'} a {data_final or 'hoje'}"
+    partes = [
+        f"<html><head><meta charset='utf-8'><title>Relatório {usuario}</title></head><body>",
+        f"<h1>Dashboard de Produtividade - {usuario}</h1><p>Período: {periodo} | Gerado em {date.today():%d/%m/%Y}</p>",
+        "<h2>Visão Geral</h2>",
+        tabela_html(resumo, ['Tempo Médio por Cadastro'])
+    ]
+    for i, (titulo, fig) in enumerate(graficos):
+        partes.append(f"<h3>{titulo}</h3>")
+        partes.append(fig.to_html(full_html=False, include_plotlyjs='cdn' if i == 0 else False))
+    partes += [
+        "<h2>Métricas Individuais</h2>",
+        tabela_html(metricas_analistas, ['Tempo Médio por Cadastro']),
+        "<h3>Filas Realizadas por Analista</h3>",
+        tabela_html(filas_analistas, ['TMO Médio por Fila']),
+        "</body></html>"
+    ]
+    with open(os.path.join(pasta_usuario, 'relatorio.html'), 'w', encoding='utf-8') as file:
+        file.write('\n'.join(partes))
+
+    return usuario, len(df_total)
+
+# Função para gerar os relatórios de todos os usuários em paralelo, um processo por conjunto de dados
+def gerar_relatorios(usuarios, pasta_saida, processos=None, data_inicial=None, data_final=None):
+    falhas = []
+    with ProcessPoolExecutor(max_workers=processos) as executor:
+        tarefas = {executor.submit(gerar_relatorio, usuario, pasta_saida, data_inicial, data_final): usuario for usuario in usuarios}
+        for tarefa in as_completed(tarefas):
+            usuario = tarefas[tarefa]
+            try:
+                _, linhas = tarefa.result()
+                print(f"{usuario}: relatório gerado ({linhas} linhas)")
+            except Exception as erro:
+                falhas.append(usuario)
+                print(f"{usuario}: falha ao gerar relatório - {erro}", file=sys.stderr)
+    return falhas
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Gera relatórios estáticos (HTML e Parquet) da dashboard para todos os usuários")
+    parser.add_argument('--saida', default=os.path.join('relatorios', date.today().isoformat()), help="pasta onde os relatórios serão gravados")
+    parser.add_argument('--usuarios', nargs='*', help="usuários a processar (padrão: todos com dados acumulados)")
+    parser.add_argument('--processos', type=int, default=None, help="quantidade de processos (padrão: um por núcleo)")
+    parser.add_argument('--inicio', type=date.fromisoformat, default=None, help="data inicial no formato AAAA-MM-DD")
+    parser.add_argument('--fim', type=date.fromisoformat, default=None, help="data final no formato AAAA-MM-DD")
+    args = parser.parse_args()
+
+    usuarios = args.usuarios or listar_usuarios()
+    if not usuarios:
+        sys.exit("Nenhum usuário com dados acumulados encontrado.")
+    falhas = gerar_relatorios(usuarios, args.saida, args.processos, args.inicio, args.fim)
+    sys.exit(1 if falhas else 0)
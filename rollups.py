@@ -0,0 +1,215 @@
+import os
+import pickle
+import threading
+import numpy as np
+import pandas as pd
+from esbocos import calcular_baldes, mesclar_esbocos, quantis_do_esboco, quantis_timedelta
+from anomalias import calcular_baselines
+from janelas import calcular_janelas, mesclar_janelas
+
+# Agregados persistidos ao lado dos dados de cada usuário, válidos para uma versão do arquivo de dados.
+# Cada componente sabe se calcular a partir das linhas e se atualizar com as linhas novas de uma carga,
+# assim uma nova planilha atualiza os agregados sem reprocessar todo o histórico.
+
+COLUNAS_CHAVE = ['Dia', 'USUÁRIO QUE CONCLUIU A TAREFA', 'FILA']
+
+_rollups_em_cache = {}
+_trava = threading.Lock()
+
+# Função para montar o nome do arquivo de agregados do usuário
+def arquivo_rollups(usuario):
+    return f'rollups_{usuario}.pkl'
+
+# Função para selecionar as tarefas que entram no TMO (finalizadas ou canceladas com data e tempo válidos)
+def tarefas_concluidas(df):
+    df = df[df['SITUAÇÃO DA TAREFA'].isin(['Finalizada', 'Cancelada'])]
+    df = df.dropna(subset=['DATA DE CONCLUSÃO DA TAREFA', 'TEMPO MÉDIO OPERACIONAL'])
+    if 'FILA' not in df.columns:
+        df = df.assign(FILA=None)
+    return df
+
+# Esboços de quantis do tempo operacional por dia, analista e fila (contagem por balde logarítmico)
+def calcular_quantis(df):
+    df = tarefas_concluidas(df)
+    esbocos = pd.DataFrame({
+        'Dia': df['DATA DE CONCLUSÃO DA TAREFA'].dt.normalize(),
+        'USUÁRIO QUE CONCLUIU A TAREFA': df['USUÁRIO QUE CONCLUIU A TAREFA'],
+        'FILA': df['FILA'].fillna(''),
+        'Balde': calcular_baldes(df['TEMPO MÉDIO OPERACIONAL'].dt.total_seconds())
+    })
+    return esbocos.groupby(COLUNAS_CHAVE + ['Balde'], as_index=False).size().rename(columns={'size': 'Contagem'})
+
+def mesclar_quantis(atual, novos):
+    combinados = pd.concat([atual, novos], ignore_index=True)
+    return combinados.groupby(COLUNAS_CHAVE + ['Balde'], as_index=False)['Contagem'].sum()
+
+# Conclusões por dia, analista e hora do dia, contadas com bincount sobre um código inteiro (dia, analista, hora)
+def calcular_horas(df):
+    df = df[df['SITUAÇÃO DA TAREFA'].isin(['Finalizada', 'Cancelada'])].dropna(subset=['DATA DE CONCLUSÃO DA TAREFA'])
+    colunas = ['Dia', 'USUÁRIO QUE CONCLUIU A TAREFA', 'Hora', 'Contagem']
+    if df.empty:
+        return pd.DataFrame({'Dia': pd.Series(dtype='datetime64[ns]'), 'USUÁRIO QUE CONCLUIU A TAREFA': pd.Series(dtype=object),
+                             'Hora': pd.Series(dtype=np.int8), 'Contagem': pd.Series(dtype=np.int64)}, columns=colunas)
+
+    datas = df['DATA DE CONCLUSÃO DA TAREFA']
+    codigos_dia, dias = pd.factorize(datas.dt.normalize())
+    codigos_analista, analistas = pd.factorize(df['USUÁRIO QUE CONCLUIU A TAREFA'].fillna(''))
+    codigos = (codigos_dia.astype(np.int64) * len(analistas) + codigos_analista) * 24 + datas.dt.hour.to_numpy()
+    contagens = np.bincount(codigos, minlength=len(dias) * len(analistas) * 24)
+
+    preenchidos = np.flatnonzero(contagens)
+    codigo_dia_analista, horas = np.divmod(preenchidos, 24)
+    indice_dia, indice_analista = np.divmod(codigo_dia_analista, len(analistas))
+    return pd.DataFrame({
+        'Dia': dias[indice_dia],
+        'USUÁRIO QUE CONCLUIU A TAREFA': analistas[indice_analista],
+        'Hora': horas.astype(np.int8),
+        'Contagem': contagens[preenchidos]
+    }, columns=colunas)
+
+def mesclar_horas(atual, novos):
+    combinados = pd.concat([atual, novos], ignore_index=True)
+    return combinados.groupby(['Dia', 'USUÁRIO QUE CONCLUIU A TAREFA', 'Hora'], as_index=False)['Contagem'].sum()
+
+# Totais diários por analista, situação e finalização: quantidade de tarefas e soma do tempo operacional em segundos
+# (tempos inválidos somam zero mas a tarefa conta, igual ao cálculo do TMO na dashboard)
+COLUNAS_DIARIO = ['Dia', 'USUÁRIO QUE CONCLUIU A TAREFA', 'SITUAÇÃO DA TAREFA', 'FINALIZAÇÃO']
+
+def calcular_diario(df):
+    df = df.dropna(subset=['DATA DE CONCLUSÃO DA TAREFA'])
+    diario = pd.DataFrame({
+        'Dia': df['DATA DE CONCLUSÃO DA TAREFA'].dt.normalize(),
+        'USUÁRIO QUE CONCLUIU A TAREFA': df['USUÁRIO QUE CONCLUIU A TAREFA'].fillna(''),
+        'SITUAÇÃO DA TAREFA': df['SITUAÇÃO DA TAREFA'].fillna(''),
+        'FINALIZAÇÃO': df['FINALIZAÇÃO'].fillna(''),
+        'Tempo_Total': df['TEMPO MÉDIO OPERACIONAL'].dt.total_seconds().fillna(0)
+    })
+    return diario.groupby(COLUNAS_DIARIO, as_index=False).agg(
+        Contagem=('Tempo_Total', 'size'),
+        Tempo_Total=('Tempo_Total', 'sum')
+    )
+
+def mesclar_diario(atual, novos):
+    combinados = pd.concat([atual, novos], ignore_index=True)
+    return combinados.groupby(COLUNAS_DIARIO, as_index=False)[['Contagem', 'Tempo_Total']].sum()
+
+# Componentes dos agregados: nome -> (calcular a partir das linhas, mesclar com as linhas novas)
+COMPONENTES = {
+    'quantis': (calcular_quantis, mesclar_quantis),
+    'horas': (calcular_horas, mesclar_horas),
+    'diario': (calcular_diario, mesclar_diario),
+    'janelas': (calcular_janelas, mesclar_janelas)
+}
+
+# Componentes derivados de outros componentes, recalculados uma vez por versão: nome -> função(rollups)
+DERIVADOS = {
+    'baselines': lambda rollups: calcular_baselines(rollups['quantis'])
+}
+
+# Função para calcular os componentes derivados depois que os componentes base foram atualizados
+def calcular_derivados(rollups):
+    for nome, calcular in DERIVADOS.items():
+        rollups[nome] = calcular(rollups)
+    return rollups
+
+# Função para calcular todos os componentes a partir do DataFrame completo
+def calcular_rollups(df_total, versao):
+    rollups = {'versao': versao}
+    for nome, (calcular, _) in COMPONENTES.items():
+        rollups[nome] = calcular(df_total)
+    return calcular_derivados(rollups)
+
+# Função para verificar se o arquivo salvo tem todos os componentes (arquivos antigos são recalculados)
+def componentes_completos(rollups):
+    return all(nome in rollups for nome in list(COMPONENTES) + list(DERIVADOS))
+
+# Funções para ler e gravar o arquivo de agregados
+def ler_rollups(usuario):
+    try:
+        with open(arquivo_rollups(usuario), 'rb') as file:
+            return pickle.load(file)
+    except (FileNotFoundError, EOFError, pickle.UnpicklingError):
+        return None
+
+def salvar_rollups(usuario, rollups):
+    arquivo_temporario = arquivo_rollups(usuario) + '.tmp'
+    with open(arquivo_temporario, 'wb') as file:
+        pickle.dump(rollups, file)
+    os.replace(arquivo_temporario, arquivo_rollups(usuario))
+    with _trava:
+        _rollups_em_cache[usuario] = rollups
+
+# Função para obter os agregados da versão atual dos dados: memória, arquivo ou recálculo a partir do DataFrame
+def obter_rollups(usuario, versao, df_total):
+    with _trava:
+        rollups = _rollups_em_cache.get(usuario)
+    if rollups is not None and rollups.get('versao') == versao:
+        return rollups
+
+    rollups = ler_rollups(usuario)
+    if rollups is None or rollups.get('versao') != versao or not componentes_completos(rollups):
+        rollups = calcular_rollups(df_total, versao)
+        salvar_rollups(usuario, rollups)
+    else:
+        with _trava:
+            _rollups_em_cache[usuario] = rollups
+    return rollups
+
+# Função para obter os agregados sem ter o DataFrame em mãos: devolve None se não houver agregados da versão informada
+def rollups_atualizados(usuario, versao):
+    with _trava:
+        rollups = _rollups_em_cache.get(usuario)
+    if rollups is None or rollups.get('versao') != versao:
+        rollups = ler_rollups(usuario)
+    if rollups is None or rollups.get('versao') != versao or not componentes_completos(rollups):
+        return None
+    with _trava:
+        _rollups_em_cache[usuario] = rollups
+    return rollups
+
+# Função chamada após uma carga: mescla os agregados das linhas novas quando o arquivo salvo corresponde à versão anterior
+# Se os agregados estiverem desatualizados eles são recalculados por completo na próxima leitura
+def atualizar_rollups(usuario, versao_anterior, versao_nova, df_novos):
+    rollups = ler_rollups(usuario)
+    if rollups is None or rollups.get('versao') != versao_anterior or not componentes_completos(rollups):
+        return False
+    for nome, (calcular, mesclar) in COMPONENTES.items():
+        rollups[nome] = mesclar(rollups[nome], calcular(df_novos))
+    rollups['versao'] = versao_nova
+    calcular_derivados(rollups)
+    salvar_rollups(usuario, rollups)
+    return True
+
+# Função para filtrar os esboços por período, analista e fila
+def filtrar_quantis(rollups, data_inicial, data_final, analista=None, fila=None):
+    quantis = rollups['quantis']
+    filtro = (quantis['Dia'] >= pd.Timestamp(data_inicial)) & (quantis['Dia'] <= pd.Timestamp(data_final))
+    if analista is not None:
+        filtro &= quantis['USUÁRIO QUE CONCLUIU A TAREFA'] == analista
+    if fila is not None:
+        filtro &= quantis['FILA'] == fila
+    return quantis[filtro]
+
+# Função para calcular o p50, p90 e p99 do tempo operacional em um período, juntando os esboços selecionados
+def percentis_tmo(rollups, data_inicial, data_final, analista=None, fila=None):
+    esbocos = filtrar_quantis(rollups, data_inicial, data_final, analista, fila)
+    return quantis_timedelta(quantis_do_esboco(mesclar_esbocos(esbocos)))
+
+# Função para montar a tabela de percentis do tempo operacional por fila
+def percentis_por_fila(rollups, data_inicial, data_final, analista=None):
+    esbocos = filtrar_quantis(rollups, data_inicial, data_final, analista)
+    linhas = []
+    for fila, esbocos_fila in esbocos.groupby('FILA'):
+        quantis = quantis_timedelta(quantis_do_esboco(mesclar_esbocos(esbocos_fila)))
+        linhas.append({'Fila': fila, 'Quantidade': int(esbocos_fila['Contagem'].sum()), 'p50': quantis[0.5], 'p90': quantis[0.9], 'p99': quantis[0.99]})
+    return pd.DataFrame(linhas, columns=['Fila', 'Quantidade', 'p50', 'p90', 'p99'])
+
+# Função para montar a matriz dia da semana x hora (7 x 24) de conclusões no período, opcionalmente de um analista
+def mapa_calor_semana(rollups, data_inicial, data_final, analista=None):
+    horas = rollups['horas']
+    filtro = (horas['Dia'] >= pd.Timestamp(data_inicial)) & (horas['Dia'] <= pd.Timestamp(data_final))
+    if analista is not None:
+        filtro &= horas['USUÁRIO QUE CONCLUIU A TAREFA'] == analista
+    horas = horas[filtro]
+    codigos = horas['Dia'].dt.weekday.to_numpy() * 24 + horas['Hora'].to_numpy().astype(np.int64)
+    return np.bincount(codigos, weights=horas['Contagem'].to_numpy(), minlength=7 * 24).reshape(7, 24)
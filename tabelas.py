@@ -0,0 +1,73 @@
+import streamlit as st
+import math
+import pandas as pd
+from exportacao import FORMATOS, exportar
+
+# Quantidade de linhas enviadas ao navegador por página
+TAMANHO_PAGINA = 50
+FORMATO_MINUTOS = '%.2f min'
+
+# Função para ordenar a tabela no servidor usando os valores originais (números e timedelta, não o texto formatado)
+def ordenar_tabela(df, coluna, decrescente):
+    if coluna is None:
+        return df
+    if coluna == df.index.name:
+        return df.sort_index(ascending=not decrescente, kind='stable')
+    return df.sort_values(by=coluna, ascending=not decrescente, kind='stable', na_position='last')
+
+# Função para recortar a página atual; as durações vão como minutos (número), ordenáveis no navegador
+def pagina_tabela(df, pagina, tamanho_pagina):
+    inicio = (pagina - 1) * tamanho_pagina
+    df_pagina = df.iloc[inicio:inicio + tamanho_pagina].copy()
+    for coluna in colunas_duracao(df_pagina):
+        df_pagina[coluna] = df_pagina[coluna].dt.total_seconds() / 60
+    return df_pagina
+
+# Função para listar as colunas de duração (TMO, tempos de análise, percentis)
+def colunas_duracao(df):
+    return [coluna for coluna in df.columns if pd.api.types.is_timedelta64_dtype(df[coluna])]
+
+# Função para exibir uma tabela paginada e ordenada no servidor
+# Os dados vão tipados para o st.dataframe e a formatação vai como column_config, sem pandas Styler nem texto pré-formatado,
+# então o tempo de renderização depende do tamanho da página e não da quantidade de linhas
+def exibir_tabela(df, chave, column_config=None, hide_index=True, width=1080, tamanho_pagina=TAMANHO_PAGINA):
+    total_linhas = len(df)
+    total_paginas = max(1, math.ceil(total_linhas / tamanho_pagina))
+    pagina = 1
+
+    # Controles de ordenação e paginação só aparecem quando a tabela não cabe em uma página
+    if total_paginas > 1:
+        colunas_ordenacao = list(df.columns) if hide_index or df.index.name is None else [df.index.name] + list(df.columns)
+        col1, col2, col3 = st.columns([3, 1, 1])
+        with col1:
+            coluna = st.selectbox("Ordenar por", [None] + colunas_ordenacao, format_func=lambda c: "Ordem original" if c is None else c, key=f"{chave}_ordem")
+        with col2:
+            decrescente = st.toggle("Decrescente", key=f"{chave}_decrescente")
+        with col3:
+            pagina = st.number_input("Página", min_value=1, max_value=total_paginas, value=1, step=1, key=f"{chave}_pagina")
+        df = ordenar_tabela(df, coluna, decrescente)
+
+    # Durações exibidas em minutos com duas casas (o column_config informado para a coluna tem prioridade)
+    configuracao = {coluna: st.column_config.NumberColumn(format=FORMATO_MINUTOS) for coluna in colunas_duracao(df)}
+    configuracao.update(column_config or {})
+
+    df_pagina = pagina_tabela(df, pagina, tamanho_pagina)
+    st.dataframe(df_pagina, hide_index=hide_index, width=width, column_config=configuracao)
+
+    if total_paginas > 1:
+        inicio = (pagina - 1) * tamanho_pagina
+        st.caption(f"Linhas {inicio + 1} a {min(inicio + tamanho_pagina, total_linhas)} de {total_linhas}")
+
+# Função para exibir a exportação das tabelas da visão (nome -> DataFrame já filtrado)
+# O arquivo só é gerado quando o botão é clicado, numa thread separada da reexecução da página
+def exibir_exportacao(tabelas, chave):
+    with st.expander("Exportar dados"):
+        col1, col2 = st.columns(2)
+        with col1:
+            nome = st.selectbox("Dados", list(tabelas), key=f"{chave}_exportar_dados")
+        with col2:
+            formato = st.radio("Formato", list(FORMATOS), horizontal=True, key=f"{chave}_exportar_formato")
+        extensao, mime = FORMATOS[formato]
+        df = tabelas[nome]
+        st.download_button(f"Baixar {len(df)} linhas", data=lambda: exportar(df, formato), file_name=f"{chave}_{nome.lower().replace(' ', '_')}.{extensao}",
+                           mime=mime, on_click="ignore", key=f"{chave}_exportar_baixar")
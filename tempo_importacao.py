@@ -0,0 +1,53 @@
+import argparse
+import os
+import subprocess
+import sys
+
+# Pasta da aplicação: os módulos são importados a partir dela, de onde quer que o script seja executado
+PASTA_APP = os.path.dirname(os.path.abspath(__file__))
+
+# Módulos da aplicação medidos por padrão
+MODULOS_PADRAO = ['login', 'dashboard', 'diario', 'metricas', 'graficos', 'tabelas']
+
+# Função para medir a importação de um módulo em um processo novo usando o -X importtime do Python
+def medir_importacao(modulo):
+    resultado = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {modulo}'],
+        capture_output=True, text=True, cwd=PASTA_APP
+    )
+    if resultado.returncode != 0:
+        raise RuntimeError(f"Falha ao importar {modulo}: {resultado.stderr.strip().splitlines()[-1]}")
+
+    # Cada linha tem o formato "import time: self [us] | cumulative | imported package"
+    # As dependências aparecem antes do módulo que as importou, com um recuo de dois espaços por nível
+    total = 0
+    dependencias = {}
+    diretas = {}
+    for linha in resultado.stderr.splitlines():
+        if not linha.startswith('import time:') or 'self [us]' in linha:
+            continue
+        _, cumulativo, nome = linha[len('import time:'):].split('|')
+        nivel = (len(nome) - len(nome.lstrip(' ')) - 1) // 2
+        if nivel == 0:
+            if nome.strip() == modulo:
+                total = int(cumulativo) / 1000
+                dependencias = diretas
+            diretas = {}
+        elif nivel == 1:
+            diretas[nome.strip()] = int(cumulativo) / 1000
+    return total, dependencias
+
+# Função para exibir o relatório de custo de importação por módulo
+def relatorio(modulos, detalhes):
+    for modulo in modulos:
+        total, dependencias = medir_importacao(modulo)
+        print(f"{modulo:<44} {total:>10.1f} ms")
+        for nome, custo in sorted(dependencias.items(), key=lambda item: item[1], reverse=True)[:detalhes]:
+            print(f"    {nome:<40} {custo:>10.1f} ms")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Relatório do tempo de importação de cada módulo da dashboard")
+    parser.add_argument('modulos', nargs='*', default=MODULOS_PADRAO, help="módulos a medir")
+    parser.add_argument('--detalhes', type=int, default=5, help="quantidade de dependências mais caras exibidas por módulo")
+    args = parser.parse_args()
+    relatorio(args.modulos, args.detalhes)
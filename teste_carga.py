@@ -0,0 +1,137 @@
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from io import BytesIO
+
+import numpy as np
+import pandas as pd
+from streamlit.testing.v1 import AppTest
+
+from login import usuarios
+from dados_sinteticos import gerar_planilha
+
+# Teste de carga da dashboard: N sessões simuladas com o AppTest do Streamlit rodando ao mesmo tempo no mesmo processo
+# (compartilhando os caches, como no servidor), sobre dados sintéticos gravados numa pasta temporária. Exemplo:
+#   python teste_carga.py --sessoes 8 --rodadas 3 --orcamento-p95 3000
+
+PASTA_APP = os.path.dirname(os.path.abspath(__file__))
+TEMPO_LIMITE = 120
+
+# Função para gerar o conteúdo de um upload (planilha sintética dos últimos dias) em memória
+def gerar_upload(linhas, semente):
+    arquivo = BytesIO()
+    gerar_planilha(linhas, 7, semente).to_excel(arquivo, index=False)
+    arquivo.seek(0)
+    return arquivo
+
+# Função para executar uma ação da sessão, medindo o tempo da reexecução e falhando se a dashboard lançar exceção
+def medir(latencias, trava, acao, executar):
+    inicio = time.perf_counter()
+    at = executar()
+    duracao = (time.perf_counter() - inicio) * 1000
+    if at.exception:
+        raise RuntimeError(f"{acao}: {at.exception[0].message}")
+    with trava:
+        latencias.setdefault(acao, []).append(duracao)
+    return at
+
+# Função que simula uma sessão: login, troca de visões, filtros de datas e upload de planilhas
+def simular_sessao(numero, usuario, senha, rodadas, dias, linhas_upload, latencias, trava):
+    from ingestao import ingerir_planilha
+
+    at = AppTest.from_file(os.path.join(PASTA_APP, 'app.py'), default_timeout=TEMPO_LIMITE)
+    medir(latencias, trava, 'abertura', at.run)
+    at.sidebar.text_input[0].input(usuario)
+    at.sidebar.text_input[1].input(senha)
+    medir(latencias, trava, 'login', lambda: at.sidebar.button[0].click().run())
+
+    for rodada in range(rodadas):
+        medir(latencias, trava, 'visao_geral', lambda: at.sidebar.selectbox[0].select('Visão Geral').run())
+        # Alterna entre todo o histórico (lê os meses antigos) e o último mês
+        data_inicial = datetime.today().date() - timedelta(days=dias if rodada % 2 == 0 else 30)
+        medir(latencias, trava, 'filtro_datas', lambda: at.date_input[0].set_value(data_inicial).run())
+        medir(latencias, trava, 'metricas_individuais', lambda: at.sidebar.selectbox[0].select('Métricas Individuais').run())
+        medir(latencias, trava, 'diario_de_bordo', lambda: at.sidebar.selectbox[0].select('Diário de Bordo').run())
+        # O AppTest não simula o file_uploader: a planilha passa pela mesma ingestão do upload e a sessão reexecuta em seguida
+        arquivo = gerar_upload(linhas_upload, semente=numero * 1000 + rodada)
+        medir(latencias, trava, 'upload', lambda: (ingerir_planilha(usuario, arquivo, f'carga_{numero}_{rodada}.xlsx'), at.run())[1])
+
+# Função para obter a memória máxima (RSS) do processo em MB; None onde o módulo resource não existe (Windows)
+def memoria_maxima():
+    try:
+        import resource
+    except ImportError:
+        return None
+    maximo = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return maximo / (1024 * 1024) if sys.platform == 'darwin' else maximo / 1024
+
+# Função para executar o teste de carga e devolver as latências por ação
+def executar_teste(sessoes, rodadas, linhas, dias, linhas_upload):
+    contas = list(usuarios.items())
+    with tempfile.TemporaryDirectory() as pasta:
+        shutil.copy(os.path.join(PASTA_APP, 'finch.png'), pasta)
+        pasta_original = os.getcwd()
+        os.chdir(pasta)
+        try:
+            for indice, (usuario, _) in enumerate(contas[:sessoes]):
+                gerar_planilha(linhas, dias, semente=indice).to_excel(f'dados_acumulados_{usuario}.xlsx', index=False)
+
+            latencias = {}
+            trava = threading.Lock()
+            with ThreadPoolExecutor(max_workers=sessoes) as executor:
+                tarefas = [
+                    executor.submit(simular_sessao, numero, *contas[numero % len(contas)], rodadas, dias, linhas_upload, latencias, trava)
+                    for numero in range(sessoes)
+                ]
+                for tarefa in tarefas:
+                    tarefa.result()
+        finally:
+            os.chdir(pasta_original)
+    return latencias
+
+# Função para exibir as latências por ação e verificar os orçamentos; retorna a lista de orçamentos excedidos
+def relatorio(latencias, orcamento_p50, orcamento_p95, orcamento_memoria):
+    print(f"{'ação':<24} {'execuções':>10} {'p50 (ms)':>10} {'p95 (ms)':>10}")
+    todas = []
+    for acao, valores in latencias.items():
+        todas += valores
+        print(f"{acao:<24} {len(valores):>10} {np.percentile(valores, 50):>10.0f} {np.percentile(valores, 95):>10.0f}")
+    p50, p95 = np.percentile(todas, 50), np.percentile(todas, 95)
+    print(f"{'total':<24} {len(todas):>10} {p50:>10.0f} {p95:>10.0f}")
+
+    memoria = memoria_maxima()
+    if memoria is not None:
+        print(f"memória máxima (RSS): {memoria:.0f} MB")
+
+    excedidos = []
+    if orcamento_p50 is not None and p50 > orcamento_p50:
+        excedidos.append(f"p50 de {p50:.0f} ms acima do orçamento de {orcamento_p50:.0f} ms")
+    if orcamento_p95 is not None and p95 > orcamento_p95:
+        excedidos.append(f"p95 de {p95:.0f} ms acima do orçamento de {orcamento_p95:.0f} ms")
+    if orcamento_memoria is not None and memoria is not None and memoria > orcamento_memoria:
+        excedidos.append(f"memória máxima de {memoria:.0f} MB acima do orçamento de {orcamento_memoria:.0f} MB")
+    return excedidos
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Teste de carga da dashboard com várias sessões simultâneas")
+    parser.add_argument('--sessoes', type=int, default=4, help="quantidade de sessões simultâneas")
+    parser.add_argument('--rodadas', type=int, default=2, help="quantidade de vezes que cada sessão percorre as visões")
+    parser.add_argument('--linhas', type=int, default=20000, help="linhas da planilha sintética de cada usuário")
+    parser.add_argument('--dias', type=int, default=365, help="dias de histórico da planilha sintética")
+    parser.add_argument('--linhas-upload', type=int, default=500, help="linhas de cada planilha enviada durante o teste")
+    parser.add_argument('--orcamento-p50', type=float, default=None, help="latência p50 máxima das reexecuções em ms")
+    parser.add_argument('--orcamento-p95', type=float, default=None, help="latência p95 máxima das reexecuções em ms")
+    parser.add_argument('--orcamento-memoria', type=float, default=None, help="memória máxima (RSS) do processo em MB")
+    args = parser.parse_args()
+
+    latencias = executar_teste(args.sessoes, args.rodadas, args.linhas, args.dias, args.linhas_upload)
+    excedidos = relatorio(latencias, args.orcamento_p50, args.orcamento_p95, args.orcamento_memoria)
+    for mensagem in excedidos:
+        print(f"ORÇAMENTO EXCEDIDO: {mensagem}")
+    sys.exit(1 if excedidos else 0)
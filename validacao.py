@@ -0,0 +1,115 @@
+import unicodedata
+from datetime import datetime
+from openpyxl import load_workbook
+import pandas as pd
+from dados import converter_duracoes
+
+# Colunas que a dashboard precisa para calcular as métricas
+COLUNAS_OBRIGATORIAS = [
+    'NÚMERO DO PROTOCOLO',
+    'USUÁRIO QUE CONCLUIU A TAREFA',
+    'SITUAÇÃO DA TAREFA',
+    'TEMPO MÉDIO OPERACIONAL',
+    'DATA DE CONCLUSÃO DA TAREFA',
+    'FINALIZAÇÃO',
+    'FILA'
+]
+
+# Colunas usadas apenas na tabela de protocolos das Métricas Individuais
+COLUNAS_OPCIONAIS = ['NÚMERO REQUISIÇÃO', 'ID PROJURIS']
+
+FORMATO_DATA = '%d/%m/%Y %H:%M:%S'
+FORMATO_DATA_EXIBICAO = 'dd/mm/aaaa hh:mm:ss'
+
+# Quantidade de linhas lidas para validar os formatos e proporção máxima de valores inválidos na amostra
+LINHAS_AMOSTRA = 200
+LIMITE_INVALIDOS = 0.5
+
+# Função para normalizar o nome de uma coluna (sem acentos, espaços extras e diferença de maiúsculas)
+def normalizar_nome(nome):
+    nome = unicodedata.normalize('NFKD', str(nome)).encode('ascii', 'ignore').decode('ascii')
+    return ' '.join(nome.upper().split())
+
+# Função para ler apenas o cabeçalho e as primeiras linhas da planilha, sem carregar o arquivo inteiro
+def ler_amostra(arquivo, linhas=LINHAS_AMOSTRA):
+    workbook = load_workbook(arquivo, read_only=True, data_only=True)
+    try:
+        planilha = workbook.active
+        linhas_lidas = planilha.iter_rows(max_row=linhas + 1, values_only=True)
+        cabecalho = next(linhas_lidas, ())
+        amostra = [linha for linha in linhas_lidas if any(valor is not None for valor in linha)]
+    finally:
+        workbook.close()
+    return list(cabecalho), amostra
+
+# Função para mapear as colunas da planilha para os nomes esperados pela dashboard
+def mapear_colunas(cabecalho):
+    esperadas = {normalizar_nome(coluna): coluna for coluna in COLUNAS_OBRIGATORIAS + COLUNAS_OPCIONAIS}
+    renomear = {}
+    for coluna in cabecalho:
+        if coluna is None:
+            continue
+        canonica = esperadas.get(normalizar_nome(coluna))
+        if canonica is not None and coluna != canonica:
+            renomear[coluna] = canonica
+    return renomear
+
+# Funções para verificar se um valor da amostra será convertido corretamente nas conversões da dashboard
+def data_valida(valor):
+    if isinstance(valor, datetime):
+        return True
+    try:
+        datetime.strptime(str(valor).strip(), FORMATO_DATA)
+        return True
+    except ValueError:
+        return False
+
+# A duração passa pela mesma conversão da ingestão (converter_duracoes), com o tipo lido da célula
+def duracao_valida(valor):
+    return not pd.isnull(converter_duracoes(pd.Series([valor], dtype=object)).iloc[0])
+
+# Função para calcular a proporção de valores inválidos de uma coluna da amostra
+def proporcao_invalidos(amostra, indice, validar):
+    valores = [linha[indice] for linha in amostra if indice < len(linha) and linha[indice] not in (None, '')]
+    if not valores:
+        return 0.0
+    return sum(not validar(valor) for valor in valores) / len(valores)
+
+# Função para validar a planilha antes do processamento completo
+# Retorna se a planilha é válida, os erros, os avisos e o mapeamento de colunas a aplicar no DataFrame
+def validar_planilha(arquivo):
+    erros = []
+    avisos = []
+
+    try:
+        cabecalho, amostra = ler_amostra(arquivo)
+    except Exception as erro:
+        return {'valido': False, 'erros': [f"Não foi possível ler a planilha: {erro}"], 'avisos': [], 'renomear': {}}
+    finally:
+        if hasattr(arquivo, 'seek'):
+            arquivo.seek(0)
+
+    renomear = mapear_colunas(cabecalho)
+    colunas = [renomear.get(coluna, coluna) for coluna in cabecalho]
+
+    faltando = [coluna for coluna in COLUNAS_OBRIGATORIAS if coluna not in colunas]
+    if faltando:
+        erros.append(f"Colunas obrigatórias ausentes: {', '.join(faltando)}")
+    faltando_opcionais = [coluna for coluna in COLUNAS_OPCIONAIS if coluna not in colunas]
+    if faltando_opcionais:
+        avisos.append(f"Colunas ausentes (a tabela de protocolos ficará incompleta): {', '.join(faltando_opcionais)}")
+
+    verificacoes = [
+        ('DATA DE CONCLUSÃO DA TAREFA', data_valida, f"datas fora do formato {FORMATO_DATA_EXIBICAO}"),
+        ('TEMPO MÉDIO OPERACIONAL', duracao_valida, "durações que não podem ser convertidas")
+    ]
+    for coluna, validar, descricao in verificacoes:
+        if coluna not in colunas:
+            continue
+        invalidos = proporcao_invalidos(amostra, colunas.index(coluna), validar)
+        if invalidos > LIMITE_INVALIDOS:
+            erros.append(f"Coluna '{coluna}' com {invalidos:.0%} de {descricao} nas primeiras linhas")
+        elif invalidos > 0:
+            avisos.append(f"Coluna '{coluna}' com {invalidos:.0%} de {descricao} nas primeiras linhas, esses valores serão ignorados")
+
+    return {'valido': not erros, 'erros': erros, 'avisos': avisos, 'renomear': renomear}